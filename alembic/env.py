@@ -20,6 +20,7 @@ if config.config_file_name is not None:
 from app.database import Base
 from app.core.config import settings
 from app.models import user, post  # import ทุก model
+from app.models.search import include_object
 # from myapp import mymodel
 target_metadata = Base.metadata
 # target_metadata = None
@@ -49,6 +50,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -76,7 +78,7 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata, include_object=include_object
         )
 
         with context.begin_transaction():
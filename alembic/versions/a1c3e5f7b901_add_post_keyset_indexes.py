@@ -0,0 +1,30 @@
+"""add post keyset indexes
+
+Revision ID: a1c3e5f7b901
+Revises: 932c9ece4bbf
+Create Date: 2026-10-18 09:12:41.508223
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a1c3e5f7b901'
+down_revision: Union[str, Sequence[str], None] = '932c9ece4bbf'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('idx_post_created_at_id', 'posts', ['created_at', 'id'], unique=False)
+    op.create_index('idx_post_owner_created_at_id', 'posts', ['owner_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_post_owner_created_at_id', table_name='posts')
+    op.drop_index('idx_post_created_at_id', table_name='posts')
@@ -0,0 +1,48 @@
+"""consolidate indexes
+
+Revision ID: a8d0f2b4c679
+Revises: f6b8d0e2a457
+Create Date: 2026-10-18 21:48:05.213794
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8d0f2b4c679'
+down_revision: Union[str, Sequence[str], None] = 'f6b8d0e2a457'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Duplicates of the primary keys and unique constraints, left prefixes of the
+# keyset indexes, and indexes no query uses
+DROPPED_INDEXES = [
+    ('users', 'idx_user_email', ['email'], False),
+    ('users', 'ix_users_email', ['email'], True),
+    ('users', 'idx_user_username', ['username'], False),
+    ('users', 'ix_users_username', ['username'], True),
+    ('users', 'ix_users_id', ['id'], False),
+    ('users', 'ix_users_is_active', ['is_active'], False),
+    ('posts', 'ix_posts_id', ['id'], False),
+    ('posts', 'idx_post_owner_id', ['owner_id'], False),
+    ('posts', 'ix_posts_owner_id', ['owner_id'], False),
+    ('posts', 'idx_post_created_at', ['created_at'], False),
+    ('posts', 'ix_posts_title', ['title'], False),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, name, _, _ in DROPPED_INDEXES:
+        op.drop_index(name, table_name=table)
+    op.create_index('idx_timeline_post_id', 'timeline_entries', ['post_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_timeline_post_id', table_name='timeline_entries')
+    for table, name, columns, unique in reversed(DROPPED_INDEXES):
+        op.create_index(name, table, columns, unique=unique)
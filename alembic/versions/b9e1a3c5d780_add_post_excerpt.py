@@ -0,0 +1,35 @@
+"""add post excerpt
+
+Revision ID: b9e1a3c5d780
+Revises: a8d0f2b4c679
+Create Date: 2026-10-18 22:31:56.120487
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b9e1a3c5d780'
+down_revision: Union[str, Sequence[str], None] = 'a8d0f2b4c679'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Same rule as app.models.post.make_excerpt
+EXCERPT_LENGTH = 200
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('posts', sa.Column('excerpt', sa.String(length=EXCERPT_LENGTH), server_default='', nullable=False))
+    op.execute(sa.text(
+        "UPDATE posts SET excerpt = CASE WHEN length(content) > :length "
+        "THEN substr(content, 1, :length - 1) || :ellipsis ELSE content END"
+    ).bindparams(length=EXCERPT_LENGTH, ellipsis="…"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('posts', 'excerpt')
@@ -0,0 +1,28 @@
+"""add like created_at index
+
+Revision ID: e5a7c9d1f346
+Revises: d4f6a8c0e235
+Create Date: 2026-10-18 20:15:42.871036
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a7c9d1f346'
+down_revision: Union[str, Sequence[str], None] = 'd4f6a8c0e235'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('idx_like_created_at', 'likes', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_like_created_at', table_name='likes')
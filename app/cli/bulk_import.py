@@ -0,0 +1,311 @@
+"""Stream users or posts from NDJSON/CSV files into the database
+
+Usage:
+    python -m app.cli.bulk_import users users.ndjson
+    python -m app.cli.bulk_import posts posts.csv --chunk-size 10000 --rebuild-indexes
+
+Users need email and username, plus either `password` (hashed here with the
+configured bcrypt rounds) or `hashed_password` (an existing bcrypt hash, stored
+as is); full_name, is_active and created_at are optional.
+
+Posts need title, content and an owner: `owner_id`, or `owner` holding a username
+or email of an existing user; created_at is optional. Imported posts are not
+fanned out to timelines.
+
+Rows are read and written in chunks, each committed on its own, so memory stays
+bounded by --chunk-size. Postgres loads each chunk with COPY FROM STDIN, other
+databases with a batched executemany. Rows that can't be prepared (missing fields,
+unknown owner, a malformed owner_id or created_at) are skipped and counted as rejected. A chunk with a row that violates
+a constraint (a duplicate email or username) is rolled back, its rows are counted
+as failed and the import goes on with the next chunk.
+"""
+import argparse
+import csv
+import io
+import itertools
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timezone
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import Table, insert, inspect, or_, select
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import IntegrityError
+
+from app.core.cache import TTLCache
+from app.core.security import configure_hash_executor, get_hash_executor, hash_password, pwd_context, shutdown_hash_executor
+from app.database import engine as default_engine, utcnow
+from app.models import Post, User
+from app.models.post import make_excerpt
+from app.models.search import POSTGRES_DDL
+
+logger = logging.getLogger(__name__)
+
+USER_COLUMNS = ["email", "username", "full_name", "hashed_password", "is_active", "created_at", "updated_at"]
+POST_COLUMNS = ["title", "content", "excerpt", "owner_id", "created_at", "updated_at"]
+
+# Owners resolved by username/email, kept across chunks
+OWNER_CACHE_SIZE = 100000
+
+
+def read_records(path: str, fmt: Optional[str] = None) -> Iterator[dict]:
+    """Yield one dict per NDJSON line or CSV row without loading the file"""
+    fmt = fmt or ("csv" if path.endswith(".csv") else "ndjson")
+    with open(path, newline="", encoding="utf-8") as f:
+        if fmt == "csv":
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def chunked(records: Iterable[dict], size: int) -> Iterator[List[dict]]:
+    iterator = iter(records)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+
+def parse_timestamp(value) -> datetime:
+    """ISO 8601 string (or empty) to the naive UTC datetimes the columns store"""
+    if not value:
+        return utcnow()
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def parse_bool(value) -> bool:
+    if value in (None, ""):
+        return True
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("1", "true", "t", "yes")
+
+
+def prepare_users(records: List[dict], hash_workers: int) -> Tuple[List[dict], int]:
+    """Rows ready to insert and the number of records rejected"""
+    rows, to_hash, rejected = [], [], 0
+    for record in records:
+        hashed = record.get("hashed_password") or None
+        if not record.get("email") or not record.get("username") or not (hashed or record.get("password")):
+            rejected += 1
+            continue
+        if hashed and pwd_context.identify(hashed) is None:
+            rejected += 1
+            continue
+        try:
+            created_at = parse_timestamp(record.get("created_at"))
+        except ValueError:
+            rejected += 1
+            continue
+        rows.append({
+            "email": record["email"],
+            "username": record["username"],
+            "full_name": record.get("full_name") or None,
+            "hashed_password": hashed,
+            "is_active": parse_bool(record.get("is_active")),
+            "created_at": created_at,
+            "updated_at": created_at,
+        })
+        if hashed is None:
+            to_hash.append((rows[-1], record["password"]))
+
+    if to_hash:
+        passwords = [password for _, password in to_hash]
+        if hash_workers > 0:
+            hashes = get_hash_executor().map(hash_password, passwords, chunksize=max(1, len(passwords) // (hash_workers * 4)))
+        else:
+            hashes = map(hash_password, passwords)
+        for (row, _), hashed in zip(to_hash, hashes):
+            row["hashed_password"] = hashed
+    return rows, rejected
+
+
+class OwnerResolver:
+    """Maps owner references (username or email) to user ids, one query per chunk"""
+
+    def __init__(self):
+        self.cache = TTLCache(maxsize=OWNER_CACHE_SIZE, ttl=float("inf"))
+
+    def resolve(self, conn: Connection, references: Iterable[str]) -> dict:
+        resolved, missing = {}, set()
+        for reference in references:
+            owner_id = self.cache.get(reference)
+            if owner_id is None:
+                missing.add(reference)
+            else:
+                resolved[reference] = owner_id
+        if missing:
+            result = conn.execute(
+                select(User.id, User.username, User.email).where(or_(User.username.in_(missing), User.email.in_(missing)))
+            )
+            for user_id, username, email in result:
+                for reference in (username, email):
+                    if reference in missing:
+                        resolved[reference] = user_id
+                        self.cache.set(reference, user_id)
+        return resolved
+
+
+def prepare_posts(conn: Connection, records: List[dict], resolver: OwnerResolver) -> Tuple[List[dict], int]:
+    """Rows ready to insert and the number of records rejected"""
+    owners = resolver.resolve(conn, {r["owner"] for r in records if r.get("owner") and not r.get("owner_id")})
+    rows, rejected = [], 0
+    for record in records:
+        owner_id = record.get("owner_id") or owners.get(record.get("owner"))
+        if not record.get("title") or not record.get("content") or not owner_id:
+            rejected += 1
+            continue
+        try:
+            owner_id = int(owner_id)
+            created_at = parse_timestamp(record.get("created_at"))
+        except ValueError:
+            rejected += 1
+            continue
+        rows.append({
+            "title": record["title"],
+            "content": record["content"],
+            "excerpt": make_excerpt(record["content"]),
+            "owner_id": owner_id,
+            "created_at": created_at,
+            "updated_at": created_at,
+        })
+    return rows, rejected
+
+
+def _copy_value(value) -> str:
+    """Render a value in COPY's text format"""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+def copy_rows(conn: Connection, table: Table, columns: List[str], rows: List[dict]) -> None:
+    """Load rows with COPY FROM STDIN (psycopg2)"""
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write("\t".join(_copy_value(row[column]) for column in columns))
+        buffer.write("\n")
+    buffer.seek(0)
+    cursor = conn.connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN", buffer)
+    finally:
+        cursor.close()
+
+
+def load_rows(conn: Connection, table: Table, columns: List[str], rows: List[dict]) -> None:
+    if not rows:
+        return
+    if conn.dialect.name == "postgresql":
+        copy_rows(conn, table, columns, rows)
+    else:
+        conn.execute(insert(table), rows)
+
+
+@contextmanager
+def secondary_indexes_dropped(bind: Engine, table: Table):
+    """Drop the table's non-unique indexes for the load and rebuild them afterwards"""
+    existing = {index["name"] for index in inspect(bind).get_indexes(table.name)}
+    indexes = [index for index in table.indexes if not index.unique and index.name in existing]
+    # The full-text GIN index is created by DDL outside the metadata
+    search_index = table is Post.__table__ and bind.dialect.name == "postgresql" and "idx_post_search_vector" in existing
+
+    with bind.begin() as conn:
+        for index in indexes:
+            index.drop(conn)
+        if search_index:
+            conn.exec_driver_sql("DROP INDEX idx_post_search_vector")
+    try:
+        yield
+    finally:
+        started = time.perf_counter()
+        with bind.begin() as conn:
+            for index in indexes:
+                index.create(conn)
+            if search_index:
+                conn.exec_driver_sql(POSTGRES_DDL[1])
+            if bind.dialect.name == "postgresql":
+                conn.exec_driver_sql(f"ANALYZE {table.name}")
+        logger.info(f"Rebuilt {len(indexes) + search_index} indexes on {table.name} in {time.perf_counter() - started:.1f}s")
+
+
+def import_file(
+    bind: Engine,
+    kind: str,
+    path: str,
+    fmt: Optional[str] = None,
+    chunk_size: int = 5000,
+    rebuild_indexes: bool = False,
+    hash_workers: int = 0,
+) -> dict:
+    """Import users or posts from `path`; returns counts and throughput"""
+    table, columns = (User.__table__, USER_COLUMNS) if kind == "users" else (Post.__table__, POST_COLUMNS)
+    resolver = OwnerResolver()
+    loaded = rejected = failed = 0
+    started = time.perf_counter()
+
+    if hash_workers > 0:
+        configure_hash_executor("process", hash_workers)
+    try:
+        with secondary_indexes_dropped(bind, table) if rebuild_indexes else nullcontext():
+            for chunk in chunked(read_records(path, fmt), chunk_size):
+                try:
+                    with bind.begin() as conn:
+                        if kind == "users":
+                            rows, skipped = prepare_users(chunk, hash_workers)
+                        else:
+                            rows, skipped = prepare_posts(conn, chunk, resolver)
+                        load_rows(conn, table, columns, rows)
+                # COPY goes through the raw DBAPI cursor, its errors aren't wrapped by SQLAlchemy
+                except (IntegrityError, bind.dialect.dbapi.IntegrityError) as e:
+                    failed += len(rows)
+                    logger.warning(f"{table.name}: chunk of {len(rows)} rows rolled back: {getattr(e, 'orig', e)}")
+                else:
+                    loaded += len(rows)
+                rejected += skipped
+                logger.info(f"{table.name}: {loaded} loaded, {rejected} rejected, {failed} failed")
+    finally:
+        if hash_workers > 0:
+            shutdown_hash_executor()
+
+    seconds = time.perf_counter() - started
+    return {
+        "table": table.name,
+        "loaded": loaded,
+        "rejected": rejected,
+        "failed": failed,
+        "seconds": round(seconds, 3),
+        "rows_per_sec": round(loaded / seconds, 1) if seconds else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("kind", choices=["users", "posts"])
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=["ndjson", "csv"], help="Default: from the file extension")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--rebuild-indexes", action="store_true", help="Drop secondary indexes during the load")
+    parser.add_argument("--hash-workers", type=int, default=os.cpu_count() or 1,
+                        help="Processes hashing plain passwords (0 hashes inline)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    summary = import_file(
+        default_engine, args.kind, args.path, args.format, args.chunk_size, args.rebuild_indexes, args.hash_workers
+    )
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+# Multi-get: resolve a list of ids with one IN query, in the order they were asked for
+
+from typing import Iterable, List, Optional, Tuple
+from fastapi import HTTPException, status
+from app.core.config import settings
+
+
+def parse_ids(raw: Optional[str]) -> List[int]:
+    """Comma-separated ids from a query string, without duplicates"""
+    try:
+        ids = [int(part) for part in (raw or "").split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="ids must be comma-separated integers")
+    return unique_ids(ids)
+
+
+def unique_ids(ids: Iterable[int]) -> List[int]:
+    """Ids in first-seen order without duplicates, between 1 and BATCH_GET_MAX_IDS of them"""
+    unique = list(dict.fromkeys(ids))
+    if not unique:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No ids given")
+    if len(unique) > settings.BATCH_GET_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=f"At most {settings.BATCH_GET_MAX_IDS} ids per request"
+        )
+    return unique
+
+
+def in_requested_order(ids: List[int], rows: Iterable) -> Tuple[list, List[int]]:
+    """(rows ordered like `ids`, ids with no row)"""
+    found = {row.id: row for row in rows}
+    return [found[item_id] for item_id in ids if item_id in found], [item_id for item_id in ids if item_id not in found]
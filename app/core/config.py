@@ -1,3 +1,4 @@
+from pydantic import Field
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -8,11 +9,93 @@ class Settings(BaseSettings):
 
     # Database
     DATABASE_URL :str
+    # Connection pool (ignored for SQLite files, which don't pool)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    # Seconds before a connection is replaced, -1 to keep connections forever
+    DB_POOL_RECYCLE: int = -1
+    # Startup schema check: "alembic" (database must be at the migration head),
+    # "create" (create missing tables, local development only) or "skip"
+    SCHEMA_CHECK: str = "alembic"
+    # Read replicas for read-only routes, e.g. ["postgresql://...@replica1/db"]
+    DATABASE_REPLICA_URLS: list = []
+    # Reads by a user go to the primary for this long after they write (on every worker
+    # for clients that keep the signed cookie set on the write's response)
+    REPLICA_STICKY_SECONDS: float = 5.0
+    # A replica that failed to connect is skipped for this long
+    REPLICA_RETRY_SECONDS: float = 30.0
+    # Log statements slower than this (0 disables)
+    SLOW_QUERY_THRESHOLD_MS: float = 200.0
+    # Postgres only: EXPLAIN (ANALYZE, BUFFERS) this fraction of slow SELECTs
+    SLOW_QUERY_EXPLAIN_SAMPLE_RATE: float = 0.0
+    # Most recent slow queries kept for GET /admin/slow-queries
+    SLOW_QUERY_LOG_SIZE: int = 100
 
     # JWT
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Usernames allowed to call the /admin endpoints
+    ADMIN_USERNAMES: list = []
+
+    # Password hashing
+    BCRYPT_ROUNDS: int = 12
+    # "thread" or "process"; bcrypt releases the GIL so threads are usually enough
+    PASSWORD_HASH_EXECUTOR: str = "thread"
+    PASSWORD_HASH_WORKERS: int = 4
+
+    # Refuse new logins/registrations while this many hashes are queued or running
+    PASSWORD_HASH_MAX_PENDING: int = 64
+
+    # Rate limiting (token buckets, per minute). Rates must be positive, a bucket that
+    # never refills has no Retry-After to give; turn limiting off with RATE_LIMIT_ENABLED
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_MAX_KEYS: int = 100000
+    AUTH_IP_RATE_PER_MINUTE: float = Field(30, gt=0)
+    AUTH_IP_BURST: int = Field(10, ge=1)
+    AUTH_ACCOUNT_RATE_PER_MINUTE: float = Field(10, gt=0)
+    AUTH_ACCOUNT_BURST: int = Field(5, ge=1)
+    POST_WRITE_RATE_PER_MINUTE: float = Field(60, gt=0)
+    POST_WRITE_BURST: int = Field(20, ge=1)
+    # Proxies trusted to report the client address in X-Forwarded-For, which the
+    # per-IP limits key on; ["*"] behind a platform proxy that is the only way in
+    # (Render). Untrusted peers are keyed on their own address.
+    FORWARDED_ALLOW_IPS: list = ["127.0.0.1"]
+
+    # Verified-principal cache for get_current_user (0 disables)
+    PRINCIPAL_CACHE_SIZE: int = 10000
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 30.0
+
+    # Most ids per GET/POST /users/batch and /posts/batch
+    BATCH_GET_MAX_IDS: int = 100
+
+    # Posts
+    BULK_POST_MAX_ITEMS: int = 100
+    # Seconds between batched like_count updates
+    LIKE_FLUSH_INTERVAL_SECONDS: float = 1.0
+
+    # Trending: top TRENDING_SIZE posts of the last TRENDING_WINDOW_HOURS by likes and age
+    TRENDING_SIZE: int = 100
+    TRENDING_WINDOW_HOURS: float = 48
+    # Higher gravity makes older posts fall faster
+    TRENDING_GRAVITY: float = 1.8
+    TRENDING_REFRESH_SECONDS: float = 30.0
+    # Full recount that also picks up unlikes
+    TRENDING_REBUILD_SECONDS: float = 600.0
+
+    # Timeline
+    # Authors with at least this many followers are merged in on read instead of fanned out
+    FANOUT_FOLLOWER_THRESHOLD: int = 10000
+    # Recent posts copied into a timeline when following someone, and into every
+    # follower's when an author drops below the threshold
+    TIMELINE_BACKFILL_POSTS: int = 20
+    # How often authors that dropped below the threshold are backfilled
+    TIMELINE_BACKFILL_INTERVAL_SECONDS: float = 5.0
+
+    # Account deletion: deleted users are purged in the background, posts in batches
+    ACCOUNT_PURGE_INTERVAL_SECONDS: float = 10.0
+    ACCOUNT_PURGE_BATCH_SIZE: int = 500
 
     # CORS
     CORS_ORIGINS: list = ["*"]
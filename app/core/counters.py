@@ -0,0 +1,42 @@
+import threading
+from collections import defaultdict
+from typing import Dict, Hashable
+
+
+class CounterBuffer:
+    """Write-behind counter deltas, combined per key until the next flush
+
+    Process-local: other workers only see a delta once it has been flushed.
+    """
+
+    def __init__(self):
+        self._deltas: Dict[Hashable, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def add(self, key: Hashable, delta: int) -> None:
+        with self._lock:
+            self._deltas[key] += delta
+            if self._deltas[key] == 0:
+                del self._deltas[key]
+
+    def pending(self, key: Hashable) -> int:
+        """Delta not yet flushed for `key`"""
+        with self._lock:
+            return self._deltas.get(key, 0)
+
+    def drain(self) -> Dict[Hashable, int]:
+        """Take every pending delta; put them back with restore() if the flush fails"""
+        with self._lock:
+            deltas, self._deltas = dict(self._deltas), defaultdict(int)
+        return deltas
+
+    def restore(self, deltas: Dict[Hashable, int]) -> None:
+        for key, delta in deltas.items():
+            self.add(key, delta)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._deltas.clear()
+
+    def __len__(self) -> int:
+        return len(self._deltas)
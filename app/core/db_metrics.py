@@ -0,0 +1,145 @@
+# Connection pool metrics, collected through SQLAlchemy pool and engine events
+
+import threading
+import time
+from typing import Dict
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from app.core.metrics import metric_family, register_collector
+
+
+class _CheckoutTimingMixin:
+    """Times every checkout (waiting for a free slot, connecting, pre-ping)"""
+
+    metrics = None
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except PoolTimeoutError:
+            if self.metrics is not None:
+                self.metrics.timeouts += 1
+            raise
+        finally:
+            if self.metrics is not None:
+                self.metrics.observe_wait(time.perf_counter() - start)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class InstrumentedQueuePool(_CheckoutTimingMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_CheckoutTimingMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+class PoolMetrics:
+    """Counters and live gauges for one engine's pool"""
+
+    def __init__(self, name: str, engine: Engine):
+        self.name = name
+        self.engine = engine
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.pre_ping_failures = 0
+        self.timeouts = 0
+        self.wait_count = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self._lock = threading.Lock()
+
+    def observe_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.wait_count += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def snapshot(self) -> dict:
+        pool = self.engine.pool
+        gauges = {}
+        if isinstance(pool, QueuePool):
+            gauges = {
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "idle": pool.checkedin(),
+                # QueuePool.overflow() is negative while below pool_size
+                "overflow": max(0, pool.overflow()),
+            }
+        return {
+            "pool": type(pool).__name__,
+            **gauges,
+            "connects": self.connects,
+            "checkouts": self.checkouts,
+            "checkins": self.checkins,
+            "invalidations": self.invalidations,
+            "pre_ping_failures": self.pre_ping_failures,
+            "timeouts": self.timeouts,
+            "wait_count": self.wait_count,
+            "wait_avg_ms": round(self.wait_seconds_total / self.wait_count * 1000, 3) if self.wait_count else 0.0,
+            "wait_max_ms": round(self.wait_seconds_max * 1000, 3),
+        }
+
+
+pool_metrics: Dict[str, PoolMetrics] = {}
+
+
+def instrument_engine(engine: Engine, name: str) -> PoolMetrics:
+    """Start collecting pool metrics for a (sync) engine under `name`"""
+    metrics = PoolMetrics(name, engine)
+    if isinstance(engine.pool, _CheckoutTimingMixin):
+        engine.pool.metrics = metrics
+
+    def on_connect(dbapi_connection, connection_record):
+        metrics.connects += 1
+
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        metrics.checkouts += 1
+
+    def on_checkin(dbapi_connection, connection_record):
+        metrics.checkins += 1
+
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        metrics.invalidations += 1
+
+    def on_handle_error(context):
+        if context.is_pre_ping:
+            metrics.pre_ping_failures += 1
+
+    event.listen(engine, "connect", on_connect)
+    event.listen(engine, "checkout", on_checkout)
+    event.listen(engine, "checkin", on_checkin)
+    event.listen(engine, "invalidate", on_invalidate)
+    event.listen(engine, "handle_error", on_handle_error)
+
+    pool_metrics[name] = metrics
+    return metrics
+
+
+def pool_metrics_snapshot() -> dict:
+    return {name: metrics.snapshot() for name, metrics in pool_metrics.items()}
+
+
+def collect_pool_metrics():
+    """Pool snapshots as Prometheus gauges/counters labelled by engine"""
+    snapshots = pool_metrics_snapshot()
+    kinds = {"size": "gauge", "checked_out": "gauge", "idle": "gauge", "overflow": "gauge", "wait_max_ms": "gauge"}
+    fields = ["size", "checked_out", "idle", "overflow", "connects", "checkouts", "checkins",
+              "invalidations", "pre_ping_failures", "timeouts", "wait_count", "wait_max_ms"]
+    for field in fields:
+        samples = [({"engine": name}, snapshot[field]) for name, snapshot in snapshots.items() if field in snapshot]
+        kind = kinds.get(field, "counter")
+        name = f"db_pool_{field}" if kind == "gauge" else f"db_pool_{field}_total"
+        yield from metric_family(name, kind, f"Connection pool {field.replace('_', ' ')}", samples)
+
+
+register_collector(collect_pool_metrics)
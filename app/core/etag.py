@@ -0,0 +1,24 @@
+import hashlib
+from typing import Iterable
+from fastapi import Request, Response, status
+
+
+def compute_etag(versions: Iterable[tuple]) -> str:
+    """Weak ETag over (id, updated_at, ...) version tuples of everything in a body"""
+    digest = hashlib.sha1(repr([tuple(version) for version in versions]).encode()).hexdigest()
+    return f'W/"{digest[:20]}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Weak comparison of `etag` against the If-None-Match header"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [tag.strip() for tag in header.split(",")]
+    opaque = etag.removeprefix("W/")
+    return "*" in candidates or any(tag.removeprefix("W/") == opaque for tag in candidates)
+
+
+def not_modified(etag: str) -> Response:
+    """304 response, sent without building the body"""
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
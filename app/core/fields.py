@@ -0,0 +1,34 @@
+# Sparse fieldsets: ?fields=id,title,excerpt on list endpoints
+#
+# Only the requested fields are serialized, and only the columns behind them are
+# selected: load_only leaves the others out of the SELECT and relationships that
+# weren't asked for are not joined. Post lists can ask for the stored `excerpt`
+# instead of `content`, which may be up to 5000 characters.
+
+from typing import FrozenSet, Iterable, List, Optional
+from fastapi import HTTPException, status
+from sqlalchemy import inspect
+from sqlalchemy.orm import joinedload, load_only
+
+
+def parse_fields(raw: Optional[str], allowed: Iterable[str], default: FrozenSet[str]) -> FrozenSet[str]:
+    """Comma-separated field names checked against `allowed`; `default` when not given"""
+    if raw is None:
+        return default
+    fields = frozenset(part.strip() for part in raw.split(",") if part.strip())
+    unknown = fields - frozenset(allowed)
+    if not fields or unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(sorted(unknown)) or raw!r}; choose from {', '.join(sorted(allowed))}",
+        )
+    return fields
+
+
+def load_options(model: type, fields: Iterable[str], always: Iterable[str] = ()) -> List:
+    """load_only the columns among `fields` and `always`, joinedload the relationships among them"""
+    mapper = inspect(model)
+    fields = set(fields) | set(always)
+    columns = [getattr(model, attr.key) for attr in mapper.column_attrs if attr.key in fields]
+    relationships = [joinedload(getattr(model, rel.key)) for rel in mapper.relationships if rel.key in fields]
+    return [load_only(*columns), *relationships]
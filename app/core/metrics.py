@@ -0,0 +1,173 @@
+# Request metrics: per-route latency, status codes, in-flight requests and DB time,
+# rendered in the Prometheus text format
+
+import bisect
+import threading
+import time
+from collections import defaultdict, deque
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUANTILES = (0.5, 0.95, 0.99)
+# Recent samples per route used for quantiles
+QUANTILE_WINDOW = 2048
+
+
+class RequestStats:
+    """DB work done while serving one request"""
+
+    __slots__ = ("queries", "db_seconds", "scope")
+
+    def __init__(self, scope: Optional[dict] = None):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.scope = scope
+
+    @property
+    def route(self) -> Optional[str]:
+        """Matched route template once routing has run, else the raw path"""
+        if self.scope is None:
+            return None
+        route = self.scope.get("route")
+        return f"{self.scope['method']} {getattr(route, 'path', self.scope['path'])}"
+
+
+current_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("current_request_stats", default=None)
+
+
+def install_query_accounting(engine: Engine) -> None:
+    """Add every query's count and duration to the current request's stats"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+        stats = current_request_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += elapsed
+
+
+class RouteMetrics:
+    __slots__ = ("buckets", "count", "total", "recent", "queries", "db_seconds")
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.recent = deque(maxlen=QUANTILE_WINDOW)
+        self.queries = 0
+        self.db_seconds = 0.0
+
+    def quantiles(self) -> List[Tuple[float, float]]:
+        samples = sorted(self.recent)
+        if not samples:
+            return []
+        return [(q, samples[min(len(samples) - 1, int(q * len(samples)))]) for q in QUANTILES]
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.routes: Dict[Tuple[str, str], RouteMetrics] = defaultdict(RouteMetrics)
+        self.statuses: Dict[Tuple[str, str, int], int] = defaultdict(int)
+
+    def observe(self, method: str, route: str, status: int, seconds: float, stats: RequestStats) -> None:
+        with self._lock:
+            metrics = self.routes[(method, route)]
+            metrics.buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            metrics.count += 1
+            metrics.total += seconds
+            metrics.recent.append(seconds)
+            metrics.queries += stats.queries
+            metrics.db_seconds += stats.db_seconds
+            self.statuses[(method, route, status)] += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self.routes.clear()
+            self.statuses.clear()
+
+    def collect(self) -> Iterable[str]:
+        with self._lock:
+            routes = list(self.routes.items())
+            statuses = list(self.statuses.items())
+            in_flight = self.in_flight
+
+        yield from metric_family("http_requests_in_flight", "gauge", "Requests being served", [({}, in_flight)])
+        yield from metric_family("http_requests_total", "counter", "Requests by route and status", [
+            ({"method": method, "route": route, "status": str(status)}, count)
+            for (method, route, status), count in statuses
+        ])
+
+        yield "# HELP http_request_duration_seconds Request latency"
+        yield "# TYPE http_request_duration_seconds histogram"
+        for (method, route), metrics in routes:
+            labels = {"method": method, "route": route}
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS + (float("inf"),), metrics.buckets):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                yield sample("http_request_duration_seconds_bucket", {**labels, "le": le}, cumulative)
+            yield sample("http_request_duration_seconds_sum", labels, metrics.total)
+            yield sample("http_request_duration_seconds_count", labels, metrics.count)
+
+        yield "# HELP http_request_latency_seconds Request latency quantiles over recent requests"
+        yield "# TYPE http_request_latency_seconds summary"
+        for (method, route), metrics in routes:
+            labels = {"method": method, "route": route}
+            for q, value in metrics.quantiles():
+                yield sample("http_request_latency_seconds", {**labels, "quantile": str(q)}, value)
+            yield sample("http_request_latency_seconds_sum", labels, metrics.total)
+            yield sample("http_request_latency_seconds_count", labels, metrics.count)
+
+        yield from metric_family("http_request_db_queries_total", "counter", "SQL statements issued by route", [
+            ({"method": method, "route": route}, metrics.queries) for (method, route), metrics in routes
+        ])
+        yield from metric_family("http_request_db_seconds_total", "counter", "Time spent in SQL by route", [
+            ({"method": method, "route": route}, metrics.db_seconds) for (method, route), metrics in routes
+        ])
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def sample(name: str, labels: dict, value: float) -> str:
+    """One Prometheus sample line"""
+    if labels:
+        rendered = ",".join(f'{key}="{_escape(str(val))}"' for key, val in labels.items())
+        return f"{name}{{{rendered}}} {value}"
+    return f"{name} {value}"
+
+
+def metric_family(name: str, kind: str, help_text: str, samples: Iterable[Tuple[dict, float]]) -> Iterable[str]:
+    """HELP/TYPE header followed by the samples of one metric"""
+    yield f"# HELP {name} {help_text}"
+    yield f"# TYPE {name} {kind}"
+    for labels, value in samples:
+        yield sample(name, labels, value)
+
+
+registry = MetricsRegistry()
+
+# Other modules register functions yielding exposition lines (pool, cache, ...)
+collectors: List[Callable[[], Iterable[str]]] = [registry.collect]
+
+
+def register_collector(collector: Callable[[], Iterable[str]]) -> None:
+    collectors.append(collector)
+
+
+def render_prometheus() -> str:
+    lines: List[str] = []
+    for collector in collectors:
+        lines.extend(collector())
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,57 @@
+# Startup schema check: Alembic owns the schema, the app only verifies it is current
+
+import logging
+from pathlib import Path
+from typing import Set
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+SCHEMA_CHECK_MODES = ("alembic", "create", "skip")
+
+
+class SchemaOutOfDateError(RuntimeError):
+    pass
+
+
+def alembic_heads() -> Set[str]:
+    """Head revisions of the migration scripts"""
+    # Imported here so "skip" mode never loads Alembic
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+
+    return set(ScriptDirectory.from_config(Config(str(ALEMBIC_INI))).get_heads())
+
+
+def database_revisions(connection) -> Set[str]:
+    """Revisions stamped in the database's alembic_version table (sync connection)"""
+    from alembic.runtime.migration import MigrationContext
+
+    return set(MigrationContext.configure(connection).get_current_heads())
+
+
+async def check_schema(engine: AsyncEngine, mode: str) -> None:
+    """Run the startup schema check: "alembic" verifies the database is at head,
+    "create" creates missing tables (local development), "skip" does nothing"""
+    if mode not in SCHEMA_CHECK_MODES:
+        raise ValueError(f"Unknown schema check mode: {mode}")
+    if mode == "skip":
+        return
+
+    async with engine.begin() as conn:
+        if mode == "create":
+            from app.database import Base
+            import app.models  # noqa: F401  register every table on Base.metadata
+
+            await conn.run_sync(Base.metadata.create_all)
+            return
+
+        current = await conn.run_sync(database_revisions)
+    heads = alembic_heads()
+    if current != heads:
+        raise SchemaOutOfDateError(
+            f"Database schema is at {sorted(current) or 'no revision'}, expected {sorted(heads)}; run `alembic upgrade head`"
+        )
+    logger.info(f"Database schema at head {', '.join(sorted(heads))}")
@@ -0,0 +1,44 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+
+
+def _encode(values: list) -> str:
+    raw = json.dumps(values, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode(cursor: str) -> list:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded.encode()))
+
+
+# Keyset cursor: opaque token wrapping the (created_at, id) of the last row on a page
+def encode_cursor(created_at: datetime, item_id: int) -> str:
+    """Encode a (created_at, id) position into an opaque cursor"""
+    return _encode([created_at.isoformat(), item_id])
+
+
+def decode_cursor(cursor: str) -> Optional[Tuple[datetime, int]]:
+    """Decode a cursor back into (created_at, id), or None if it is invalid"""
+    try:
+        created_at, item_id = _decode(cursor)
+        return datetime.fromisoformat(created_at), int(item_id)
+    except Exception:
+        return None
+
+
+# Ranked results (search) page on (rank, id) instead
+def encode_rank_cursor(rank: float, item_id: int) -> str:
+    """Encode a (rank, id) position into an opaque cursor"""
+    return _encode([rank, item_id])
+
+
+def decode_rank_cursor(cursor: str) -> Optional[Tuple[float, int]]:
+    """Decode a rank cursor back into (rank, id), or None if it is invalid"""
+    try:
+        rank, item_id = _decode(cursor)
+        return float(rank), int(item_id)
+    except Exception:
+        return None
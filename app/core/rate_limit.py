@@ -0,0 +1,52 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Hashable
+
+
+class TokenBucketLimiter:
+    """Token bucket per key: `rate` tokens per second, up to `burst` tokens
+
+    Each key costs one small entry; least recently used keys are evicted past
+    `max_keys`. An evicted key simply starts again with a full bucket.
+    """
+
+    def __init__(self, rate: float, burst: int, max_keys: int = 100000):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[Hashable, list]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, key: Hashable, cost: int = 1) -> float:
+        """Take `cost` tokens for `key`; returns 0 if allowed, else seconds until they are available
+
+        A cost above `burst` is allowed from a full bucket and leaves it in debt,
+        so the tokens are still paid back before the key can write again.
+        """
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = [float(self.burst), now]
+                self._buckets[key] = bucket
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                tokens, last = bucket
+                bucket[0] = min(float(self.burst), tokens + (now - last) * self.rate)
+                bucket[1] = now
+
+            needed = min(cost, self.burst)
+            if bucket[0] >= needed:
+                bucket[0] -= cost
+                return 0.0
+            return (needed - bucket[0]) / self.rate if self.rate > 0 else float("inf")
+
+    def reset(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
@@ -0,0 +1,97 @@
+# Fast JSON path for trusted ORM results
+#
+# For a response_model route, FastAPI validates every returned ORM object against
+# the schema, converts the models back into Python dicts and lists, and encodes
+# those with json.dumps. On post pages, most of that time goes to re-validating
+# each nested owner's EmailStr. model_response builds the models from the ORM
+# attributes with model_construct (no validation: the rows were validated on the
+# way in) and has pydantic-core write the JSON bytes directly.
+
+from functools import lru_cache
+from typing import Any, FrozenSet, List, Optional, Tuple, Type, get_args, get_origin
+from fastapi import Response
+from pydantic import AliasChoices, BaseModel, TypeAdapter
+
+
+@lru_cache(maxsize=None)
+def type_adapter(schema: Any) -> TypeAdapter:
+    return TypeAdapter(schema)
+
+
+def _attribute_names(field, name: str) -> Tuple[str, ...]:
+    alias = field.validation_alias
+    if isinstance(alias, AliasChoices):
+        return tuple(choice for choice in alias.choices if isinstance(choice, str))
+    if isinstance(alias, str):
+        return (alias,)
+    return (name,)
+
+
+def _model_type(annotation: Any) -> Optional[Type[BaseModel]]:
+    return annotation if isinstance(annotation, type) and issubclass(annotation, BaseModel) else None
+
+
+@lru_cache(maxsize=None)
+def _construct_plan(schema: Type[BaseModel]) -> List[tuple]:
+    """(field name, attribute names to try, nested model or None, whether a list of it) per field"""
+    plan = []
+    for name, field in schema.model_fields.items():
+        many = get_origin(field.annotation) in (list, List)
+        nested = _model_type(get_args(field.annotation)[0] if many else field.annotation)
+        plan.append((name, _attribute_names(field, name), nested, many))
+    return plan
+
+
+def construct(schema: Type[BaseModel], obj: Any, fields: Optional[FrozenSet[str]] = None) -> BaseModel:
+    """Build `schema` from a trusted ORM object's attributes without validating them
+
+    With `fields`, only those top-level fields are read, so attributes deferred by
+    the query are never touched (that would lazy-load them).
+    """
+    values = {}
+    for name, attributes, nested, many in _construct_plan(schema):
+        if fields is not None and name not in fields:
+            continue
+        for attribute in attributes:
+            if hasattr(obj, attribute):
+                value = getattr(obj, attribute)
+                break
+        else:
+            continue
+        if nested is not None and value is not None:
+            value = [construct(nested, item) for item in value] if many else construct(nested, value)
+        values[name] = value
+    return schema.model_construct(**values)
+
+
+def render_model(schema: Any, content: Any, fields: Optional[FrozenSet[str]] = None) -> bytes:
+    """Encode ORM `content` as `schema` (a model or List[model]) straight to JSON bytes
+
+    `fields` limits the output to those top-level fields of the model.
+    """
+    if get_origin(schema) in (list, List):
+        (item,) = get_args(schema)
+        models = [construct(item, obj, fields) for obj in content]
+        include = None if fields is None else {"__all__": set(fields)}
+    else:
+        models = construct(schema, content, fields)
+        include = None if fields is None else set(fields)
+    return type_adapter(schema).dump_json(models, by_alias=True, include=include)
+
+
+def model_response(
+    schema: Any,
+    content: Any,
+    response: Optional[Response] = None,
+    status_code: int = 200,
+    fields: Optional[FrozenSet[str]] = None,
+) -> Response:
+    """JSON response for trusted ORM `content` serialized as `schema`
+
+    Headers set on the route's injected `response` (ETag, X-Next-Cursor, ...) are
+    carried over, as FastAPI only merges them for non-Response return values.
+    """
+    fast = Response(render_model(schema, content, fields), status_code=status_code, media_type="application/json")
+    if response is not None:
+        fast.headers.raw.extend(header for header in response.headers.raw if header[0] != b"content-length")
+    return fast
@@ -1,12 +1,19 @@
 from passlib.context import CryptContext
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime,timedelta, timezone
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 from app.core.config import settings
+import asyncio
 
 
 # Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated= "auto")
+# Hashes with a different work factor are flagged by needs_update and upgraded on login
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated= "auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
+
+# Dedicated pool for bcrypt so a login burst can't starve the request threadpool
+_hash_executor: Optional[Executor] = None
+_pending_hashes = 0
 
 # func: hash password
 def hash_password(password:str ) -> str:
@@ -20,6 +27,65 @@ def verify_password(plain_password:str, hashed_password:str) -> bool:
     return pwd_context.verify(plain_password,hashed_password)
 
 
+# func: verify_and_update_password
+def verify_and_update_password(plain_password:str, hashed_password:str) -> Tuple[bool, Optional[str]]:
+    """Verify password, returning a new hash if the stored one uses outdated settings"""
+    return pwd_context.verify_and_update(plain_password,hashed_password)
+
+
+def get_hash_executor() -> Executor:
+    """Return the password hashing pool, creating it on first use"""
+    global _hash_executor
+    if _hash_executor is None:
+        configure_hash_executor(settings.PASSWORD_HASH_EXECUTOR, settings.PASSWORD_HASH_WORKERS)
+    return _hash_executor
+
+
+def configure_hash_executor(kind: str, workers: int) -> None:
+    """(Re)create the password hashing pool as a "thread" or "process" pool"""
+    global _hash_executor
+    shutdown_hash_executor()
+    if kind == "process":
+        _hash_executor = ProcessPoolExecutor(max_workers=workers)
+    elif kind == "thread":
+        _hash_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+    else:
+        raise ValueError(f"Unknown password hash executor: {kind}")
+
+
+def shutdown_hash_executor() -> None:
+    """Stop the password hashing pool"""
+    global _hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=False)
+        _hash_executor = None
+
+
+def password_hash_pool_saturated() -> bool:
+    """Whether the password hashing pool has more queued work than we accept"""
+    return _pending_hashes >= settings.PASSWORD_HASH_MAX_PENDING
+
+
+async def _run_on_hash_executor(func, *args):
+    global _pending_hashes
+    _pending_hashes += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_hash_executor(), func, *args)
+    finally:
+        _pending_hashes -= 1
+
+
+async def hash_password_async(password: str) -> str:
+    """Hash password on the password hashing pool"""
+    return await _run_on_hash_executor(hash_password, password)
+
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify password on the password hashing pool, see verify_and_update_password"""
+    return await _run_on_hash_executor(verify_and_update_password, plain_password, hashed_password)
+
+
 # create access token
 def create_access_token(data:dict, expires_delta: Optional[timedelta]= None) -> str:
     """Create JWT access token"""
@@ -43,4 +109,17 @@ def decode_access_token(token: str) -> Optional[dict]:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         return payload
     except Exception as e:
-        return None
\ No newline at end of file
+        return None
+
+
+def token_subject(authorization: Optional[str]) -> Optional[str]:
+    """Subject (user id) of a "Bearer <jwt>" header, verified but without a DB lookup"""
+    if not authorization:
+        return None
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer":
+        return None
+    payload = decode_access_token(token)
+    if payload is None or payload.get("sub") is None:
+        return None
+    return str(payload["sub"])
\ No newline at end of file
@@ -0,0 +1,167 @@
+# Slow-query log: statements over a threshold are logged with their parameters and
+# originating route, and kept in a bounded ring for the admin endpoint
+
+import asyncio
+import logging
+import random
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence
+from sqlalchemy import event
+from sqlalchemy.engine import URL, Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import NullPool
+from app.core.config import settings
+from app.core.metrics import current_request_stats
+
+logger = logging.getLogger(__name__)
+
+# Longest repr of the bound parameters that is logged/kept
+MAX_PARAMETERS_LENGTH = 500
+# Values bound to these names (or name_1, name_2, ...) are masked in the log and the
+# ring, as are email addresses bound to any name (login looks one up by username too)
+SENSITIVE_PARAMETERS = frozenset({"email", "hashed_password", "password"})
+MASK = "***"
+# Sampled EXPLAINs running at once; more are skipped rather than queued
+MAX_PENDING_EXPLAINS = 2
+
+_NUMBERED_SUFFIX = re.compile(r"_\d+$")
+_EMAIL = re.compile(r"[^@\s]+@[^@\s]+")
+
+
+def _mask(name, value):
+    if isinstance(name, str) and _NUMBERED_SUFFIX.sub("", name) in SENSITIVE_PARAMETERS:
+        return MASK
+    if isinstance(value, str) and _EMAIL.fullmatch(value):
+        return MASK
+    return value
+
+
+def bind_names(context) -> Optional[Sequence[str]]:
+    """Bind parameter names in positional order, when the statement was compiled by SQLAlchemy"""
+    compiled = getattr(context, "compiled", None)
+    return getattr(compiled, "positiontup", None)
+
+
+def mask_parameters(parameters, names: Optional[Sequence[str]], executemany: bool = False):
+    """Copy of the bound parameters with sensitive values replaced by MASK"""
+    if executemany:
+        return [mask_parameters(row, names) for row in parameters]
+    if isinstance(parameters, dict):
+        return {name: _mask(name, value) for name, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        if names is None or len(names) != len(parameters):
+            names = [None] * len(parameters)
+        return tuple(_mask(name, value) for name, value in zip(names, parameters))
+    return parameters
+
+
+class SlowQueryLog:
+    def __init__(self, threshold_ms: float, explain_sample_rate: float, maxsize: int):
+        self.threshold_ms = threshold_ms
+        self.explain_sample_rate = explain_sample_rate
+        self._entries = deque(maxlen=maxsize)
+        self._lock = threading.Lock()
+        self._explain_engines: Dict[URL, AsyncEngine] = {}
+        self._pending_explains = 0
+        self._explain_tasks = set()
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold_ms > 0
+
+    def entries(self) -> List[dict]:
+        """Recorded slow queries, newest first"""
+        with self._lock:
+            return list(reversed(self._entries))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def should_explain(self, conn, statement: str, executemany: bool) -> bool:
+        # ANALYZE runs the statement again, so only ever for single SELECTs
+        return (
+            conn.dialect.name == "postgresql"
+            and not executemany
+            and statement.lstrip()[:6].upper() == "SELECT"
+            and random.random() < self.explain_sample_rate
+        )
+
+    def _explain_engine(self, url: URL) -> AsyncEngine:
+        # Unpooled and separate from the app's engine: an EXPLAIN never waits for, or
+        # holds, one of the connections requests are queueing for
+        engine = self._explain_engines.get(url)
+        if engine is None:
+            engine = self._explain_engines[url] = create_async_engine(url, poolclass=NullPool)
+        return engine
+
+    async def explain(self, url: URL, statement: str, parameters, entry: dict) -> None:
+        """EXPLAIN (ANALYZE, BUFFERS) on its own connection, then attach the plan to `entry`"""
+        try:
+            async with self._explain_engine(url).connect() as explain_conn:
+                rows = await explain_conn.exec_driver_sql("EXPLAIN (ANALYZE, BUFFERS) " + statement, parameters)
+                plan = "\n".join(row[0] for row in rows)
+            with self._lock:
+                entry["plan"] = plan
+        except Exception as e:
+            logger.warning(f"EXPLAIN of slow query failed: {e}")
+        finally:
+            self._pending_explains -= 1
+
+    def schedule_explain(self, conn, statement: str, parameters, entry: dict) -> None:
+        """Run explain() in the background, off the request path; skipped without an event loop or when busy"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if self._pending_explains >= MAX_PENDING_EXPLAINS:
+            return
+        self._pending_explains += 1
+        task = loop.create_task(self.explain(conn.engine.url, statement, parameters, entry))
+        self._explain_tasks.add(task)
+        task.add_done_callback(self._explain_tasks.discard)
+
+    def record(self, conn, statement: str, parameters, executemany: bool, duration_ms: float, context=None) -> None:
+        stats = current_request_stats.get()
+        route = stats.route if stats is not None else None
+        rendered_parameters = repr(mask_parameters(parameters, bind_names(context), executemany))[:MAX_PARAMETERS_LENGTH]
+        logger.warning(
+            f"Slow query ({duration_ms:.1f} ms) on {route or 'no route'}: {statement} | parameters: {rendered_parameters}"
+        )
+
+        entry = {
+            "at": datetime.now(timezone.utc).isoformat(),
+            "duration_ms": round(duration_ms, 3),
+            "route": route,
+            "statement": statement,
+            "parameters": rendered_parameters,
+            # Filled in by the sampled background EXPLAIN, if any
+            "plan": None,
+        }
+        with self._lock:
+            self._entries.append(entry)
+        if self.should_explain(conn, statement, executemany):
+            self.schedule_explain(conn, statement, parameters, entry)
+
+
+slow_query_log = SlowQueryLog(
+    settings.SLOW_QUERY_THRESHOLD_MS, settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE, settings.SLOW_QUERY_LOG_SIZE
+)
+
+
+def install_slow_query_log(engine: Engine, log: SlowQueryLog = slow_query_log) -> None:
+    """Time every statement on a (sync) engine and record the ones over the threshold"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("slow_query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        duration_ms = (time.perf_counter() - conn.info["slow_query_start_time"].pop()) * 1000
+        if log.enabled and duration_ms >= log.threshold_ms and not statement.startswith("EXPLAIN"):
+            log.record(conn, statement, parameters, executemany, duration_ms, context)
@@ -1,16 +1,75 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
+from datetime import datetime, timezone
+from fastapi import Request
+from typing import List, Optional
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.core.db_metrics import InstrumentedAsyncQueuePool, InstrumentedQueuePool, instrument_engine
+from app.core.metrics import install_query_accounting
+from app.core.slow_query import install_slow_query_log
+from app.core.security import token_subject
+import hashlib
+import hmac
+import itertools
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
-# Create engine
+# Sync driver -> asyncio driver for the same database
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+
+def get_async_database_url(url: str) -> str:
+    """Convert a sync database URL to its asyncio driver equivalent"""
+    parsed = make_url(url)
+    drivername = ASYNC_DRIVERS.get(parsed.drivername, parsed.drivername)
+    return parsed.set(drivername=drivername).render_as_string(hide_password=False)
+
+
+def pool_options(url: str, is_async: bool) -> dict:
+    """Pool class and sizing from settings; SQLite keeps its dialect default pool"""
+    if make_url(url).get_backend_name() == "sqlite":
+        return {}
+    return {
+        "poolclass": InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+
+
+def enable_sqlite_foreign_keys(engine) -> None:
+    """Enforce foreign keys on SQLite connections, which ignore ON DELETE CASCADE otherwise"""
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def set_foreign_keys(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+
+# Create engine (sync, used by Alembic and scripts)
 engine = create_engine(
     settings.DATABASE_URL,
     pool_pre_ping=True,
-    echo=settings.DEBUG
+    echo=settings.DEBUG,
+    **pool_options(settings.DATABASE_URL, is_async=False)
 )
+instrument_engine(engine, "sync")
+enable_sqlite_foreign_keys(engine)
 
 SessionLocal = sessionmaker(
     autocommit= False,
@@ -20,21 +79,150 @@ SessionLocal = sessionmaker(
 
 )
 
+# Create async engine (used by the API)
+async_engine = create_async_engine(
+    get_async_database_url(settings.DATABASE_URL),
+    pool_pre_ping=True,
+    echo=settings.DEBUG,
+    **pool_options(settings.DATABASE_URL, is_async=True)
+)
+instrument_engine(async_engine.sync_engine, "primary")
+enable_sqlite_foreign_keys(async_engine.sync_engine)
+install_query_accounting(async_engine.sync_engine)
+install_slow_query_log(async_engine.sync_engine)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+
+
+# Carries the read-your-writes window to whichever worker serves the next read
+STICKY_COOKIE = "read_primary_until"
+
+
+class ReplicaRouter:
+    """Round-robin read replicas with health tracking and read-your-writes stickiness
+
+    The window is kept per process and in a signed cookie set on the write's response,
+    so a client that keeps cookies reads from the primary on any worker; one that
+    drops them only does so on the worker that served the write.
+    """
+
+    def __init__(self, urls: List[str], sticky_seconds: float, retry_seconds: float):
+        self.engines = [
+            create_async_engine(get_async_database_url(url), pool_pre_ping=True, echo=settings.DEBUG, **pool_options(url, is_async=True))
+            for url in urls
+        ]
+        for index, replica in enumerate(self.engines):
+            instrument_engine(replica.sync_engine, f"replica-{index}")
+            install_query_accounting(replica.sync_engine)
+            install_slow_query_log(replica.sync_engine)
+        self.sessionmakers = [
+            async_sessionmaker(bind=replica, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+            for replica in self.engines
+        ]
+        self.sticky_seconds = sticky_seconds
+        self.retry_seconds = retry_seconds
+        self._unhealthy_until = [0.0] * len(self.engines)
+        self._next = itertools.count()
+        # user id -> recently wrote, entries expire after the sticky window
+        self._recent_writers = TTLCache(maxsize=100000, ttl=sticky_seconds)
+
+    def record_write(self, user_id: Optional[str]) -> None:
+        """Pin the user's reads to the primary for the sticky window"""
+        if user_id is not None and self.engines:
+            self._recent_writers.set(user_id, True)
+
+    def _signature(self, user_id: str, until: int) -> str:
+        message = f"{user_id}:{until}".encode()
+        return hmac.new(settings.SECRET_KEY.encode(), message, hashlib.sha256).hexdigest()
+
+    def sticky_cookie(self, user_id: str) -> str:
+        """Value of STICKY_COOKIE pinning the user's reads to the primary for the sticky window"""
+        until = int(time.time() + self.sticky_seconds) + 1
+        return f"{until}.{self._signature(user_id, until)}"
+
+    def is_sticky(self, user_id: Optional[str], cookie: Optional[str] = None) -> bool:
+        if user_id is None:
+            return False
+        if self._recent_writers.get(user_id) is not None:
+            return True
+        if not cookie:
+            return False
+        until, _, signature = cookie.partition(".")
+        if not until.isdigit() or int(until) < time.time():
+            return False
+        return hmac.compare_digest(signature, self._signature(user_id, int(until)))
+
+    def mark_unhealthy(self, index: int) -> None:
+        self._unhealthy_until[index] = time.monotonic() + self.retry_seconds
+
+    async def connect(self, user_id: Optional[str] = None, sticky_cookie: Optional[str] = None) -> Optional[AsyncSession]:
+        """Connected session on the next healthy replica, or None to use the primary"""
+        if not self.engines or self.is_sticky(user_id, sticky_cookie):
+            return None
+
+        start = next(self._next)
+        now = time.monotonic()
+        for offset in range(len(self.engines)):
+            index = (start + offset) % len(self.engines)
+            if self._unhealthy_until[index] > now:
+                continue
+            db = self.sessionmakers[index]()
+            try:
+                await db.connection()
+                return db
+            except (DBAPIError, OSError) as e:
+                logger.warning(f"Read replica {index} unavailable, falling back: {e}")
+                await db.close()
+                self.mark_unhealthy(index)
+        return None
+
+
+replica_router = ReplicaRouter(settings.DATABASE_REPLICA_URLS, settings.REPLICA_STICKY_SECONDS, settings.REPLICA_RETRY_SECONDS)
+
 Base = declarative_base()
 
+
+def utcnow() -> datetime:
+    """Naive UTC timestamp for DateTime columns (asyncpg rejects aware values)"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
 from fastapi.exceptions import HTTPException
 
-def get_db():
+async def get_db():
     """Dependency for database session"""
-    db = SessionLocal()
-    try:
-        yield db
-    except HTTPException:
-        # ไม่ catch HTTPException
-        raise
-    except Exception as e:
-        logger.error(f"Database error: {str(e)}", exc_info=True)
-        db.rollback()
-        raise
-    finally:
-        db.close()
\ No newline at end of file
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        except HTTPException:
+            # ไม่ catch HTTPException
+            raise
+        except Exception as e:
+            logger.error(f"Database error: {str(e)}", exc_info=True)
+            await db.rollback()
+            raise
+
+
+
+async def get_read_db(request: Request):
+    """Dependency for read-only routes: a replica session when one is healthy, else the primary"""
+    db = await replica_router.connect(
+        token_subject(request.headers.get("Authorization")), request.cookies.get(STICKY_COOKIE)
+    )
+    if db is None:
+        db = AsyncSessionLocal()
+    async with db:
+        try:
+            yield db
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Database error: {str(e)}", exc_info=True)
+            await db.rollback()
+            raise
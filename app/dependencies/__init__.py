@@ -1,5 +1,5 @@
-from app.dependencies.auth import get_current_user, oauth2_scheme
+from app.dependencies.auth import get_admin_user, get_current_user, oauth2_scheme, principal_cache
 
 
 
-__all__ = [get_current_user,oauth2_scheme]
\ No newline at end of file
+__all__ = [get_admin_user,get_current_user,oauth2_scheme,principal_cache]
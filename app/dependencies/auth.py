@@ -5,8 +5,13 @@
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
 from app.database import get_db
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.metrics import metric_family, register_collector
 from app.core.security import decode_access_token
 from app import models
 import logging
@@ -15,9 +20,30 @@ logger = logging.getLogger(__name__)
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
-def get_current_user(
+# Verified principals by user id, saves the users SELECT on most authenticated requests
+principal_cache = TTLCache(maxsize=settings.PRINCIPAL_CACHE_SIZE, ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS)
+
+
+def collect_principal_cache_metrics():
+    stats = principal_cache.stats()
+    yield from metric_family("principal_cache_hits_total", "counter", "Principal cache hits", [({}, stats["hits"])])
+    yield from metric_family("principal_cache_misses_total", "counter", "Principal cache misses", [({}, stats["misses"])])
+    yield from metric_family("principal_cache_size", "gauge", "Principals currently cached", [({}, stats["size"])])
+
+
+register_collector(collect_principal_cache_metrics)
+
+
+def _detached_copy(user: models.User) -> models.User:
+    """Clean, session-less copy of a user that is safe to share between requests"""
+    copy = models.User(**{attr.key: getattr(user, attr.key) for attr in inspect(models.User).column_attrs})
+    make_transient_to_detached(copy)
+    return copy
+
+
+async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> models.User:
     """Get current user from JWT token"""
     credentials_exception = HTTPException(
@@ -30,15 +56,29 @@ def get_current_user(
     if payload is None:
         raise credentials_exception
     
-    user_id: int = payload.get("sub")
-    if user_id is None:
+    try:
+        user_id = int(payload.get("sub"))
+    except (TypeError, ValueError):
         raise credentials_exception
     
-    user = db.query(models.User).filter(models.User.id == user_id).first()
-    if user is None:
+    cached = principal_cache.get(user_id)
+    if cached is not None:
+        # Attach a copy to this session without querying
+        return await db.merge(cached, load=False)
+
+    user = await db.get(models.User, user_id)
+    # Deleted accounts wait for the purger, treat them as gone already
+    if user is None or user.deleted_at is not None:
         raise credentials_exception
     
     if not user.is_active:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User is inactive")
     
-    return user
\ No newline at end of file
+    principal_cache.set(user_id, _detached_copy(user))
+    return user
+
+async def get_admin_user(current_user: models.User = Depends(get_current_user)) -> models.User:
+    """Current user, who must be listed in ADMIN_USERNAMES"""
+    if current_user.username not in settings.ADMIN_USERNAMES:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+    return current_user
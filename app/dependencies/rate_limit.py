@@ -0,0 +1,76 @@
+# Rate limits and load shedding, checked before any hashing or DB work
+
+import math
+from fastapi import Form, HTTPException, Request, status
+from app.core.config import settings
+from app.core.rate_limit import TokenBucketLimiter
+from app.core.security import token_subject, password_hash_pool_saturated
+
+
+def _per_minute(rate: float, burst: int) -> TokenBucketLimiter:
+    return TokenBucketLimiter(rate=rate / 60, burst=burst, max_keys=settings.RATE_LIMIT_MAX_KEYS)
+
+
+auth_ip_limiter = _per_minute(settings.AUTH_IP_RATE_PER_MINUTE, settings.AUTH_IP_BURST)
+auth_account_limiter = _per_minute(settings.AUTH_ACCOUNT_RATE_PER_MINUTE, settings.AUTH_ACCOUNT_BURST)
+post_write_limiter = _per_minute(settings.POST_WRITE_RATE_PER_MINUTE, settings.POST_WRITE_BURST)
+
+LIMITERS = [auth_ip_limiter, auth_account_limiter, post_write_limiter]
+
+
+def reset_rate_limiters() -> None:
+    """Forget every bucket (tests)"""
+    for limiter in LIMITERS:
+        limiter.reset()
+
+
+def _check(limiter: TokenBucketLimiter, key, cost: int = 1) -> None:
+    if not settings.RATE_LIMIT_ENABLED:
+        return
+    retry_after = limiter.acquire(key, cost)
+    if retry_after > 0:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests",
+            headers={"Retry-After": str(math.ceil(retry_after))}
+        )
+
+
+def _shed_if_saturated() -> None:
+    if password_hash_pool_saturated():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server busy, try again",
+            headers={"Retry-After": "1"}
+        )
+
+
+def client_ip(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+
+async def limit_login(request: Request, username: str = Form(...)) -> None:
+    """Limit login attempts per client IP and per account"""
+    _check(auth_ip_limiter, ("ip", client_ip(request)))
+    _check(auth_account_limiter, ("account", username.lower()))
+    _shed_if_saturated()
+
+
+async def limit_register(request: Request) -> None:
+    """Limit registrations per client IP"""
+    _check(auth_ip_limiter, ("ip", client_ip(request)))
+    _shed_if_saturated()
+
+
+def charge_post_writes(request: Request, posts: int) -> None:
+    """Take one post-write token per post, keyed on the token subject without a DB lookup"""
+    user_id = token_subject(request.headers.get("Authorization"))
+    if user_id is None:
+        # get_current_user rejects the request
+        return
+    _check(post_write_limiter, ("user", user_id), posts)
+
+
+async def limit_post_writes(request: Request) -> None:
+    """Limit single-post writes per user"""
+    charge_post_writes(request, 1)
@@ -1,24 +1,51 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, PlainTextResponse
 from contextlib import asynccontextmanager
+from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
 from app.core.config import settings
-from app.database import Base,engine
-from app.routers import auth, users, posts
+from app.database import AsyncSessionLocal, async_engine
+from app.core.db_metrics import pool_metrics_snapshot
+from app.core.metrics import render_prometheus
+from app.core.migrations import check_schema
+from app.core.security import shutdown_hash_executor
+from app.middleware import MetricsMiddleware, ReadYourWritesMiddleware
+from app.routers import admin, auth, users, posts, timeline
+from app.services.accounts import run_account_purger
+from app.services.likes import run_like_flusher
+from app.services.timeline import run_timeline_backfiller
+from app.services.trending import run_trending_refresher, trending
+import asyncio
 import logging
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Create tables
-Base.metadata.create_all(bind=engine)
-
 # Lifespan
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("App starting up")
+    # Alembic owns the schema; nothing touches the database at import time
+    await check_schema(async_engine, settings.SCHEMA_CHECK)
+    like_flusher = asyncio.create_task(run_like_flusher(AsyncSessionLocal, settings.LIKE_FLUSH_INTERVAL_SECONDS))
+    trending_refresher = asyncio.create_task(run_trending_refresher(
+        AsyncSessionLocal, trending, settings.TRENDING_REFRESH_SECONDS, settings.TRENDING_REBUILD_SECONDS
+    ))
+    account_purger = asyncio.create_task(run_account_purger(
+        AsyncSessionLocal, settings.ACCOUNT_PURGE_INTERVAL_SECONDS, settings.ACCOUNT_PURGE_BATCH_SIZE
+    ))
+    timeline_backfiller = asyncio.create_task(run_timeline_backfiller(
+        AsyncSessionLocal, settings.TIMELINE_BACKFILL_INTERVAL_SECONDS
+    ))
     yield
+    # Cancelling flushes whatever likes are still buffered
+    like_flusher.cancel()
+    trending_refresher.cancel()
+    account_purger.cancel()
+    timeline_backfiller.cancel()
+    await asyncio.gather(like_flusher, trending_refresher, account_purger, timeline_backfiller, return_exceptions=True)
+    shutdown_hash_executor()
     logger.info("App shutting down")
 
 
@@ -27,7 +54,9 @@ app = FastAPI(
     title= settings.PROJECT_NAME,
     version = "1.0.0",
     description= "Twitter-like API Backend",
-    lifespan= lifespan
+    lifespan= lifespan,
+    # orjson encodes the validated response content faster than stdlib json
+    default_response_class=ORJSONResponse
 )
 
 app.add_middleware(
@@ -38,19 +67,38 @@ app.add_middleware(
     allow_headers = ["*"]
 
 )
+app.add_middleware(ReadYourWritesMiddleware)
+# Outermost, so its timings cover the other middleware too
+app.add_middleware(MetricsMiddleware)
+# Before anything reads request.client: behind a proxy that is the proxy's address
+app.add_middleware(ProxyHeadersMiddleware, trusted_hosts=settings.FORWARDED_ALLOW_IPS)
 
 
 # Health check
 @app.get("/health", tags=["health"])
-def health_check():
+async def health_check():
     """Health check endpoint"""
     return {"status" : "ok", "version": "1.0.0"}
 
 
+@app.get("/health/db", tags=["health"])
+async def db_health_check():
+    """Connection pool gauges and counters per engine"""
+    return pool_metrics_snapshot()
+
+
+@app.get("/metrics", tags=["health"], response_class=PlainTextResponse)
+async def metrics():
+    """Request, connection pool and cache metrics in the Prometheus text format"""
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
 # Include router
 app.include_router(auth.router,prefix=settings.API_V1_STR)
 app.include_router(users.router,prefix=settings.API_V1_STR)
 app.include_router(posts.router,prefix=settings.API_V1_STR)
+app.include_router(timeline.router,prefix=settings.API_V1_STR)
+app.include_router(admin.router,prefix=settings.API_V1_STR)
 
 
 
@@ -0,0 +1,83 @@
+import time
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.metrics import RequestStats, current_request_stats, registry
+from app.core.security import token_subject
+from app.database import STICKY_COOKIE, replica_router
+
+UNSAFE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+# POST only to carry a long id list in the body, these don't write
+READ_ONLY_POST_SUFFIXES = ("/batch",)
+
+
+class ReadYourWritesMiddleware:
+    """Pin a user's reads to the primary for a short window after a successful write"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (scope["type"] != "http" or scope["method"] not in UNSAFE_METHODS or not replica_router.engines
+                or scope["path"].rstrip("/").endswith(READ_ONLY_POST_SUFFIXES)):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                user_id = token_subject(Headers(scope=scope).get("authorization"))
+                replica_router.record_write(user_id)
+                if user_id is not None:
+                    # For the other workers, which never see this write
+                    MutableHeaders(scope=message).append(
+                        "Set-Cookie",
+                        f"{STICKY_COOKIE}={replica_router.sticky_cookie(user_id)}; "
+                        f"Max-Age={int(replica_router.sticky_seconds) + 1}; Path=/; HttpOnly; SameSite=Lax",
+                    )
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+class MetricsMiddleware:
+    """Per-route latency, status and DB accounting; adds a Server-Timing header"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope)
+        token = current_request_stats.set(stats)
+        start = time.perf_counter()
+        status_code = 500
+        registry.in_flight += 1
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                elapsed = time.perf_counter() - start
+                MutableHeaders(scope=message).append(
+                    "Server-Timing",
+                    f'db;dur={stats.db_seconds * 1000:.2f};desc="{stats.queries} queries", '
+                    f"app;dur={(elapsed - stats.db_seconds) * 1000:.2f}",
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            registry.in_flight -= 1
+            current_request_stats.reset(token)
+            # Router stores the matched route in the scope; label by template to bound cardinality
+            route = scope.get("route")
+            registry.observe(
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                status_code,
+                time.perf_counter() - start,
+                stats,
+            )
@@ -1,4 +1,8 @@
 from app.models.user import User
 from app.models.post import Post
+from app.models.follow import Follow
+from app.models.timeline import TimelineEntry
+from app.models.like import Like
+from app.models import search  # noqa: F401  full-text search DDL
 
-__all__ = ["User","Post"]
\ No newline at end of file
+__all__ = ["User","Post","Follow","TimelineEntry","Like"]
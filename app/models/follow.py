@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index
+from app.database import Base, utcnow
+
+class Follow(Base):
+    __tablename__ = "follows"
+    __table_args__ = (
+        # Fan-out looks up every follower of an author
+        Index("idx_follow_followee_id", "followee_id", "follower_id"),
+    )
+
+    follower_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    followee_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    created_at = Column(DateTime, default=utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<Follow(follower_id={self.follower_id}, followee_id={self.followee_id})>"
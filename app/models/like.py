@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index
+from app.core.counters import CounterBuffer
+from app.database import Base, utcnow
+
+class Like(Base):
+    __tablename__ = "likes"
+    __table_args__ = (
+        Index("idx_like_post_id", "post_id"),
+        # Trending reads the likes created since its last refresh
+        Index("idx_like_created_at", "created_at"),
+    )
+
+    # The primary key is the unique (user, post) pair that makes liking idempotent
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    post_id = Column(Integer, ForeignKey("posts.id", ondelete="CASCADE"), primary_key=True)
+    created_at = Column(DateTime, default=utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<Like(user_id={self.user_id}, post_id={self.post_id})>"
+
+
+# post id -> likes committed but not yet added to posts.like_count
+pending_like_counts = CounterBuffer()
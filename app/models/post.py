@@ -1,24 +1,51 @@
 from sqlalchemy import Column, Integer, Boolean, DateTime, String, ForeignKey, Index, Text
-from sqlalchemy.orm import relationship
-from datetime import datetime, timezone
-from app.database import Base
+from sqlalchemy.orm import relationship, validates
+from app.database import Base, utcnow
+from app.models.like import pending_like_counts
+
+# Characters of content kept in posts.excerpt, for list views that don't need the full text
+EXCERPT_LENGTH = 200
+
+
+def make_excerpt(content: str) -> str:
+    """Content cut to EXCERPT_LENGTH characters, ending in an ellipsis when shortened"""
+    if len(content) <= EXCERPT_LENGTH:
+        return content
+    return content[:EXCERPT_LENGTH - 1] + "\u2026"
+
 
 class Post(Base):
     __tablename__ = "posts"
     __table_args__ = (
-        Index("idx_post_owner_id", "owner_id"),
-        Index("idx_post_created_at", "created_at"),
+        # Keyset pagination seeks on (created_at, id), per author on (owner_id, created_at, id);
+        # their prefixes serve created_at range and owner_id lookups (and the FK cascade)
+        Index("idx_post_created_at_id", "created_at", "id"),
+        Index("idx_post_owner_created_at_id", "owner_id", "created_at", "id"),
     )
 
-    id = Column(Integer, primary_key=True, index=True)
-    title = Column(String(255), nullable=False, index=True)
+    id = Column(Integer, primary_key=True)
+    title = Column(String(255), nullable=False)
     content = Column(Text, nullable=False)
-    owner_id = Column(Integer,ForeignKey("users.id", ondelete="CASCADE"), nullable=False,index=True)
-    created_at = Column(DateTime, default=datetime.now(timezone.utc), nullable=False)
-    updated_at = Column(DateTime, default=datetime.now(timezone.utc),onupdate=datetime.now(timezone.utc))
+    # Kept in sync with content by make_excerpt, Core inserts must set it themselves
+    excerpt = Column(String(EXCERPT_LENGTH), nullable=False, server_default="")
+    owner_id = Column(Integer,ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    created_at = Column(DateTime, default=utcnow, nullable=False)
+    updated_at = Column(DateTime, default=utcnow,onupdate=utcnow)
+    # Denormalized, updated in batches from pending_like_counts
+    like_count = Column(Integer, default=0, server_default="0", nullable=False)
 
     # Relationship
     owner = relationship("User", back_populates="posts")
 
+    @validates("content")
+    def _update_excerpt(self, key, content):
+        self.excerpt = make_excerpt(content)
+        return content
+
+    @property
+    def like_total(self) -> int:
+        """Stored like count plus this process's unflushed likes"""
+        return (self.like_count or 0) + pending_like_counts.pending(self.id)
+
     def __repr__(self):
         return f"<Post(id={self.id}, title={self.title}, owner_id={self.owner_id})>"
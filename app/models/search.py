@@ -0,0 +1,53 @@
+# Full-text search structures for posts, created alongside the posts table
+#
+# Postgres: generated tsvector column with a GIN index, maintained by the database.
+# SQLite (local/tests): FTS5 external-content table kept in sync by triggers.
+
+from sqlalchemy import DDL, event
+from app.models.post import Post
+
+# Created by the DDL below and the c3e5a7b9d124 migration, not declared in the
+# metadata, so autogenerate must not offer to drop them
+UNMANAGED_COLUMNS = frozenset({("posts", "search_vector")})
+UNMANAGED_INDEXES = frozenset({"idx_post_search_vector"})
+# posts_fts and the shadow tables FTS5 keeps its index in
+UNMANAGED_TABLES = frozenset({
+    "posts_fts", "posts_fts_data", "posts_fts_idx", "posts_fts_content", "posts_fts_docsize", "posts_fts_config",
+})
+
+POSTGRES_DDL = [
+    "ALTER TABLE posts ADD COLUMN search_vector tsvector GENERATED ALWAYS AS "
+    "(to_tsvector('english', coalesce(title, '') || ' ' || coalesce(content, ''))) STORED",
+    "CREATE INDEX idx_post_search_vector ON posts USING GIN (search_vector)",
+]
+
+SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE posts_fts USING fts5(title, content, content='posts', content_rowid='id')",
+    "CREATE TRIGGER posts_fts_ai AFTER INSERT ON posts BEGIN "
+    "INSERT INTO posts_fts(rowid, title, content) VALUES (new.id, new.title, new.content); END",
+    "CREATE TRIGGER posts_fts_ad AFTER DELETE ON posts BEGIN "
+    "INSERT INTO posts_fts(posts_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content); END",
+    "CREATE TRIGGER posts_fts_au AFTER UPDATE OF title, content ON posts BEGIN "
+    "INSERT INTO posts_fts(posts_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content); "
+    "INSERT INTO posts_fts(rowid, title, content) VALUES (new.id, new.title, new.content); END",
+]
+
+for statement in POSTGRES_DDL:
+    event.listen(Post.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+
+for statement in SQLITE_DDL:
+    event.listen(Post.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+
+# The FTS table is not in the metadata, drop it with posts
+event.listen(Post.__table__, "before_drop", DDL("DROP TABLE IF EXISTS posts_fts").execute_if(dialect="sqlite"))
+
+
+def include_object(object, name, type_, reflected, compare_to) -> bool:
+    """Alembic include_object hook that leaves the search structures out of autogenerate"""
+    if type_ == "table":
+        return name not in UNMANAGED_TABLES
+    if type_ == "column":
+        return (object.table.name, name) not in UNMANAGED_COLUMNS
+    if type_ == "index":
+        return name not in UNMANAGED_INDEXES and object.table.name not in UNMANAGED_TABLES
+    return True
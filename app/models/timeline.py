@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index
+from app.database import Base
+
+class TimelineEntry(Base):
+    """Materialized home timeline row, written by fan-out on post creation"""
+    __tablename__ = "timeline_entries"
+    __table_args__ = (
+        # GET /timeline is a range read on (user_id, created_at, post_id)
+        Index("idx_timeline_user_created_at", "user_id", "created_at", "post_id"),
+        # Unfollow removes one author's entries from a timeline
+        Index("idx_timeline_user_author", "user_id", "author_id"),
+        # Deleting a post cascades to its fanned-out entries
+        Index("idx_timeline_post_id", "post_id"),
+    )
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    post_id = Column(Integer, ForeignKey("posts.id", ondelete="CASCADE"), primary_key=True)
+    author_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    # Copy of posts.created_at so the range read never touches posts
+    created_at = Column(DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<TimelineEntry(user_id={self.user_id}, post_id={self.post_id})>"
@@ -1,28 +1,33 @@
 from sqlalchemy import Column, Integer, String, DateTime, Boolean, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
-from datetime import datetime, timezone
-from app.database import Base
+from app.database import Base, utcnow
 
 class User(Base):
     __tablename__ = "users"
     __table_args__ = (
         UniqueConstraint("email", name="uq_user_email"),
         UniqueConstraint("username", name="uq_user_username"),
-        Index("idx_user_email", "email"),
-        Index("idx_user_username","username"),
+        # The purger looks up accounts pending deletion
+        Index("idx_user_deleted_at", "deleted_at"),
     )
 
-    id = Column(Integer, primary_key=True, index=True)
-    email = Column(String(255), unique=True, nullable=False, index=True)
-    username = Column(String(50), unique=True, nullable=False, index=True)
+    id = Column(Integer, primary_key=True)
+    # Unique constraints above double as the lookup indexes
+    email = Column(String(255), nullable=False)
+    username = Column(String(50), nullable=False)
     full_name = Column(String(255), nullable=True)
     hashed_password = Column(String(255),nullable=False)
-    is_active = Column(Boolean,default=True, index=True)
-    created_at = Column(DateTime, default=datetime.now(timezone.utc),nullable=False)
-    updated_at = Column(DateTime, default=datetime.now(timezone.utc), onupdate=datetime.now(timezone.utc) )
+    is_active = Column(Boolean,default=True)
+    # Denormalized, decides fan-out on write vs on read
+    follower_count = Column(Integer, default=0, server_default="0", nullable=False)
+    created_at = Column(DateTime, default=utcnow,nullable=False)
+    updated_at = Column(DateTime, default=utcnow, onupdate=utcnow )
+    # Set when the account is deleted, the row and its posts are purged later
+    deleted_at = Column(DateTime, nullable=True)
 
     # Relationships
-    posts = relationship("Post", back_populates="owner", cascade="all, delete-orphan")
+    # passive_deletes: posts go with ON DELETE CASCADE instead of being loaded to delete
+    posts = relationship("Post", back_populates="owner", cascade="all, delete-orphan", passive_deletes=True)
 
 
     # for good debug, logging, professional
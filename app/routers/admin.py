@@ -0,0 +1,19 @@
+from fastapi import APIRouter, Depends, status
+from app.core.slow_query import slow_query_log
+from app.dependencies import get_admin_user
+from typing import List
+
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(get_admin_user)])
+
+
+@router.get("/slow-queries", response_model=List[dict])
+async def get_slow_queries():
+    """Most recent slow queries, newest first, with sampled EXPLAIN plans on Postgres"""
+    return slow_query_log.entries()
+
+
+@router.delete("/slow-queries", status_code=status.HTTP_204_NO_CONTENT)
+async def clear_slow_queries():
+    """Empty the slow-query ring"""
+    slow_query_log.clear()
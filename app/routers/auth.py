@@ -1,9 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Form
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
 from app import models,schemas
 from app.database import get_db
-from app.core.security import hash_password,verify_password,create_access_token
+from app.core.security import hash_password_async,verify_and_update_password_async,create_access_token
+from app.dependencies import principal_cache
+from app.dependencies.rate_limit import limit_login, limit_register
 from app.core.config import settings
 import logging
 
@@ -11,45 +14,51 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
-@router.post("/register",response_model=schemas.UserOut, status_code=status.HTTP_201_CREATED)
-def register(user:schemas.UserCreate, db:Session=Depends(get_db)):
+@router.post("/register",response_model=schemas.UserOut, status_code=status.HTTP_201_CREATED, dependencies=[Depends(limit_register)])
+async def register(user:schemas.UserCreate, db:AsyncSession=Depends(get_db)):
     """Register a new user"""
 
     # Check if user exists
-    existing_user = db.query(models.User).filter((models.User.email == user.email) | (models.User.username == user.username)).first()
+    result = await db.execute(select(models.User).where((models.User.email == user.email) | (models.User.username == user.username)))
+    existing_user = result.scalars().first()
 
     if existing_user:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,detail="Email or username already registered")
     
-    # Create new user
+    # Create new user (bcrypt runs on the password hashing pool)
     db_user = models.User(
         email=user.email,
         username=user.username,
         full_name = user.full_name,
-        hashed_password = hash_password(user.password)
+        hashed_password = await hash_password_async(user.password)
         )
     
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
 
     logger.info(f"New user registered: {db_user.email}")
     return db_user
 
 
-@router.post("/login", response_model=schemas.Token)
-def login(
+@router.post("/login", response_model=schemas.Token, dependencies=[Depends(limit_login)])
+async def login(
     username: str = Form(...),  # Swagger field
     password: str = Form(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     # Query email หรือ username
-    db_user = db.query(models.User).filter(
+    result = await db.execute(select(models.User).where(
         (models.User.email == username) | 
         (models.User.username == username)
-    ).first()
+    ).where(models.User.deleted_at.is_(None)))
+    db_user = result.scalars().first()
     
-    if not db_user or not verify_password(password, db_user.hashed_password):
+    verified, new_hash = (False, None)
+    if db_user:
+        verified, new_hash = await verify_and_update_password_async(password, db_user.hashed_password)
+
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials",
@@ -58,6 +67,13 @@ def login(
     
     if not db_user.is_active:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User is inactive")
+
+    # Work factor changed since this hash was made, upgrade it
+    if new_hash:
+        db_user.hashed_password = new_hash
+        await db.commit()
+        principal_cache.invalidate(db_user.id)
+        logger.info(f"Password hash upgraded: {db_user.email}")
     
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
@@ -68,4 +84,4 @@ def login(
     logger.info(f"User logged in: {db_user.email}")
     
     return {"access_token": access_token, "token_type": "bearer", "user": db_user}
-    
\ No newline at end of file
+    
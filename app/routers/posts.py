@@ -1,62 +1,259 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, insert, tuple_, Select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 from app import models, schemas
+from app.core.batch import in_requested_order, parse_ids, unique_ids
+from app.core.config import settings
+from app.core.etag import compute_etag, etag_matches, not_modified
+from app.core.fields import load_options, parse_fields
+from app.core.responses import model_response
+from app.core.pagination import encode_cursor, decode_cursor, encode_rank_cursor, decode_rank_cursor
 from app.core.security import hash_password
 from app.dependencies import get_current_user
-from app.database import get_db
+from app.dependencies.rate_limit import charge_post_writes, limit_post_writes
+from app.database import get_db, get_read_db
+from app.models.like import pending_like_counts
+from app.models.post import make_excerpt
+from app.services.likes import like_post, unlike_post
+from app.services.search import search_posts
+from app.services.trending import trending
+from app.services.timeline import fan_out_post, fan_out_posts
 import logging
-from typing import List
+from typing import FrozenSet, Iterable, List, Optional
 
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/posts", tags=["posts"])
 
+# Rows fetched per round trip from the server-side cursor while exporting
+EXPORT_BATCH_SIZE = 500
 
+FIELDS_DESCRIPTION = "Comma-separated fields to return, e.g. id,title,excerpt; unpicked columns are not loaded"
 
-@router.post("/",response_model=schemas.PostOut,status_code=status.HTTP_201_CREATED)
-def create_post(post : schemas.PostCreate,db: Session = Depends(get_db) ,current_user: models.User = Depends(get_current_user)):
+
+def page_query(query: Select, skip: int, cursor: Optional[str], limit: int) -> Select:
+    """Page a posts query newest first, by keyset cursor or legacy offset
+
+    Cursor mode seeks on (created_at, id) so pages stay stable while new posts are
+    being inserted. One extra row is fetched to know whether there is a next page.
+    """
+    if cursor is not None:
+        if skip:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Use either skip or cursor, not both")
+        position = decode_cursor(cursor)
+        if position is None:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        query = query.where(tuple_(models.Post.created_at, models.Post.id) < tuple_(*position))
+
+    query = query.order_by(models.Post.created_at.desc(), models.Post.id.desc())
+    if cursor is None and skip:
+        # Deprecated: offset paging scans and discards `skip` rows
+        query = query.offset(skip)
+
+    return query.limit(limit + 1)
+
+
+def post_version(post_id: int, updated_at, owner_updated_at, like_count: int) -> tuple:
+    """ETag input for one post; likes change the representation without touching updated_at"""
+    return (post_id, updated_at, owner_updated_at, like_count + pending_like_counts.pending(post_id))
+
+
+def page_etag(versions: Iterable[tuple], fields: FrozenSet[str]) -> str:
+    """ETag of a post page rendered with `fields`; owners count only when they are shown"""
+    return compute_etag([tuple(sorted(fields)), *(
+        post_version(post_id, updated_at, owner_updated_at if "owner" in fields else None, like_count)
+        for post_id, updated_at, owner_updated_at, like_count in versions
+    )])
+
+
+def finish_page(posts: List[models.Post], response: Response, limit: int) -> List[models.Post]:
+    """Drop the look-ahead row and return the next page position in X-Next-Cursor"""
+    if len(posts) > limit:
+        posts = posts[:limit]
+        last = posts[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last.created_at, last.id)
+    return posts
+
+
+@router.post("/",response_model=schemas.PostOut,status_code=status.HTTP_201_CREATED,dependencies=[Depends(limit_post_writes)])
+async def create_post(post : schemas.PostCreate,db: AsyncSession = Depends(get_db) ,current_user: models.User = Depends(get_current_user)):
     """Create a new post"""
 
     db_post = models.Post(title = post.title,content = post.content, owner_id = current_user.id )
 
     db.add(db_post)
-    db.commit()
-    db.refresh(db_post)
+    await db.flush()
+    await fan_out_post(db, db_post, current_user)
+    await db.commit()
+    await db.refresh(db_post)
 
     logger.info(f"Post created: {db_post.id} by user {current_user.id}")
     return db_post
 
 
 
+@router.post("/bulk",response_model=List[schemas.PostOut],status_code=status.HTTP_201_CREATED)
+async def create_posts_bulk(request: Request, payload : schemas.PostBulkCreate,db: AsyncSession = Depends(get_db) ,current_user: models.User = Depends(get_current_user)):
+    """Create many posts in one transaction"""
+
+    # Charged per post, once the body is validated, so a bulk request can't outrun the write limit
+    charge_post_writes(request, len(payload.posts))
+
+    # One multi-row INSERT ... RETURNING. Ids are assigned in VALUES order, so sorting
+    # by id restores input order without sort_by_parameter_order (which makes SQLite
+    # fall back to one INSERT per row)
+    rows = [
+        {"title": post.title, "content": post.content, "excerpt": make_excerpt(post.content), "owner_id": current_user.id}
+        for post in payload.posts
+    ]
+    result = await db.scalars(insert(models.Post).returning(models.Post), rows)
+    db_posts = sorted(result.all(), key=lambda db_post: db_post.id)
+
+    await fan_out_posts(db, [db_post.id for db_post in db_posts], current_user)
+    await db.commit()
+
+    logger.info(f"Bulk created {len(db_posts)} posts by user {current_user.id}")
+    return db_posts
+
+
+
 @router.get("/",response_model=List[schemas.PostDetailOut])
-def get_posts(
-    skip: int = Query(0, ge=0),
+async def get_posts(
+    request: Request,
+    response: Response,
+    skip: int = Query(0, ge=0, description="Deprecated, use cursor"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor"),
     limit: int = Query(10, ge=1, le=100),
-    db: Session = Depends(get_db)):
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: AsyncSession = Depends(get_read_db)):
 
     """Get all post with pagination"""
-    posts = db.query(models.Post).order_by(models.Post.created_at.desc()).offset(skip).limit(limit).all()
-
-    return posts
+    fields = parse_fields(fields, schemas.POST_FIELDS, schemas.POST_DETAIL_FIELDS)
+    page = page_query(select(models.Post), skip, cursor, limit)
+
+    # Conditional GET: compare versions of the page without loading bodies
+    if request.headers.get("if-none-match"):
+        versions = await db.execute(
+            page.with_only_columns(models.Post.id, models.Post.updated_at, models.User.updated_at, models.Post.like_count)
+            .join(models.User, models.User.id == models.Post.owner_id)
+        )
+        etag = page_etag(versions, fields)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
+    # Only the picked columns; owners, when picked, in the same query instead of one lazy SELECT per post
+    result = await db.execute(page.options(*load_options(models.Post, fields, schemas.POST_KEY_FIELDS)))
+    posts = list(result.scalars().all())
+    response.headers["ETag"] = page_etag(
+        ((post.id, post.updated_at, post.owner.updated_at if "owner" in fields else None, post.like_count) for post in posts),
+        fields,
+    )
+
+    return model_response(List[schemas.PostFieldsOut], finish_page(posts, response, limit), response, fields=fields)
+
+@router.get("/search",response_model=List[schemas.PostDetailOut])
+async def search(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor"),
+    limit: int = Query(10, ge=1, le=100),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: AsyncSession = Depends(get_read_db)):
+    """Full-text search over post titles and content, best match first"""
+
+    fields = parse_fields(fields, schemas.POST_FIELDS, schemas.POST_DETAIL_FIELDS)
+    position = None
+    if cursor is not None:
+        position = decode_rank_cursor(cursor)
+        if position is None:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+    results = await search_posts(db, q, position, limit + 1, load_options(models.Post, fields, schemas.POST_KEY_FIELDS))
+    if len(results) > limit:
+        results = results[:limit]
+        last_post, last_rank = results[-1]
+        response.headers["X-Next-Cursor"] = encode_rank_cursor(last_rank, last_post.id)
+
+    return model_response(List[schemas.PostFieldsOut], [post for post, _ in results], response, fields=fields)
+
+@router.get("/trending",response_model=List[schemas.PostDetailOut])
+async def get_trending(
+    limit: int = Query(20, ge=1, le=settings.TRENDING_SIZE),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: AsyncSession = Depends(get_read_db)):
+    """Hot posts by recent likes and recency, from the precomputed ranking"""
+
+    fields = parse_fields(fields, schemas.POST_FIELDS, schemas.POST_DETAIL_FIELDS)
+    ranked = [post_id for post_id, _ in trending.top(limit)]
+    if not ranked:
+        return []
+
+    # Primary key lookup of at most `limit` posts, then back into ranking order
+    result = await db.execute(
+        select(models.Post)
+        .options(*load_options(models.Post, fields, schemas.POST_KEY_FIELDS))
+        .where(models.Post.id.in_(ranked))
+    )
+    posts = {post.id: post for post in result.scalars()}
+    return model_response(
+        List[schemas.PostFieldsOut], [posts[post_id] for post_id in ranked if post_id in posts], fields=fields
+    )
+
+async def posts_batch(db: AsyncSession, ids: List[int]) -> Response:
+    """Posts with their owners for `ids` in one IN query, in the order asked for"""
+    result = await db.execute(select(models.Post).options(joinedload(models.Post.owner)).where(models.Post.id.in_(ids)))
+    posts, missing = in_requested_order(ids, result.scalars())
+    return model_response(schemas.PostBatchOut, schemas.PostBatchOut.model_construct(items=posts, missing=missing))
+
+
+@router.get("/batch",response_model=schemas.PostBatchOut)
+async def get_posts_batch(
+    ids: str = Query(..., description=f"Comma-separated post ids, at most {settings.BATCH_GET_MAX_IDS}"),
+    db: AsyncSession = Depends(get_read_db)):
+    """Several posts by ID in one request"""
+    return await posts_batch(db, parse_ids(ids))
+
+
+@router.post("/batch",response_model=schemas.PostBatchOut)
+async def post_posts_batch(payload: schemas.BatchIds, db: AsyncSession = Depends(get_read_db)):
+    """Same as GET /batch, for id lists too long for a URL"""
+    return await posts_batch(db, unique_ids(payload.ids))
 
 @router.get("/{post_id}",response_model=schemas.PostDetailOut)
-def get_post(post_id:int, db: Session = Depends(get_db)):
+async def get_post(post_id:int, request: Request, response: Response, db: AsyncSession = Depends(get_read_db)):
     """Get single post bt ID"""
 
-    post = db.query(models.Post).filter(models.Post.id == post_id).first()
+    # Conditional GET: version lookup only, the post body is not loaded
+    if request.headers.get("if-none-match"):
+        version = await db.execute(
+            select(models.Post.id, models.Post.updated_at, models.User.updated_at, models.Post.like_count)
+            .join(models.User, models.User.id == models.Post.owner_id)
+            .where(models.Post.id == post_id)
+        )
+        row = version.first()
+        if row is not None:
+            etag = compute_etag([post_version(*row)])
+            if etag_matches(request, etag):
+                return not_modified(etag)
+
+    result = await db.execute(select(models.Post).options(joinedload(models.Post.owner)).where(models.Post.id == post_id))
+    post = result.scalars().first()
 
     if not post:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,detail="Post Not Found")
     
+    response.headers["ETag"] = compute_etag([post_version(post.id, post.updated_at, post.owner.updated_at, post.like_count)])
     return post
 
 
-@router.put("/{post_id}",response_model=schemas.PostOut)
-def update_post(post_id:int, post_update : schemas.PostUpdate, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
+@router.put("/{post_id}",response_model=schemas.PostOut,dependencies=[Depends(limit_post_writes)])
+async def update_post(post_id:int, post_update : schemas.PostUpdate, db: AsyncSession = Depends(get_db), current_user: models.User = Depends(get_current_user)):
     """Update a post (owner only)"""
 
-    post = db.query(models.Post).filter(models.Post.id == post_id).first()
+    post = await db.get(models.Post, post_id)
 
     if not post:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,detail="Post not found")
@@ -71,18 +268,18 @@ def update_post(post_id:int, post_update : schemas.PostUpdate, db: Session = Dep
     if post_update.content:
         post.content = post_update.content
 
-    db.commit()
-    db.refresh(post)
+    await db.commit()
+    await db.refresh(post)
 
     logger.info(f"Post updated: {post.id}")
     return post
 
 
 @router.delete("/{post_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_post(post_id : int, db : Session = Depends(get_db) , current_user : models.User = Depends(get_current_user)):
+async def delete_post(post_id : int, db : AsyncSession = Depends(get_db) , current_user : models.User = Depends(get_current_user)):
     """Delete a post (owner only)"""
 
-    post = db.query(models.Post).filter(models.Post.id == post_id).first()
+    post = await db.get(models.Post, post_id)
 
     if not post:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,detail="Post not found")
@@ -91,29 +288,100 @@ def delete_post(post_id : int, db : Session = Depends(get_db) , current_user : m
     if post.owner_id != current_user.id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,detail="No authorized to delete this post")
     
-    db.delete(post)
-    db.commit()
+    await db.delete(post)
+    await db.commit()
 
     logger.info(f"Post Deleted: {post_id}")
     return None
 
 
+@router.post("/{post_id}/like", status_code=status.HTTP_204_NO_CONTENT)
+async def like(post_id : int, db : AsyncSession = Depends(get_db), current_user : models.User = Depends(get_current_user)):
+    """Like a post; liking it again is a no-op"""
+
+    if not await db.get(models.Post, post_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,detail="Post not found")
+
+    if await like_post(db, current_user.id, post_id):
+        logger.info(f"User {current_user.id} liked post {post_id}")
+    return None
+
+
+@router.delete("/{post_id}/like", status_code=status.HTTP_204_NO_CONTENT)
+async def unlike(post_id : int, db : AsyncSession = Depends(get_db), current_user : models.User = Depends(get_current_user)):
+    """Remove a like; a no-op if the post wasn't liked"""
+
+    if await unlike_post(db, current_user.id, post_id):
+        logger.info(f"User {current_user.id} unliked post {post_id}")
+    return None
+
+
 @router.get("/user/{user_id}", response_model=List[schemas.PostOut])
-def get_user_posts(
+async def get_user_posts(
     user_id : int,
-    db : Session = Depends(get_db),
-    skip : int = Query(0, ge=0),
-    limit : int = Query(10, ge=1, le=100)
+    response : Response,
+    db : AsyncSession = Depends(get_read_db),
+    skip : int = Query(0, ge=0, description="Deprecated, use cursor"),
+    cursor : Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor"),
+    limit : int = Query(10, ge=1, le=100),
+    fields : Optional[str] = Query(None, description=FIELDS_DESCRIPTION)
     ):
     """Get all post by user_id """
 
+    fields = parse_fields(fields, schemas.POST_FIELDS - {"owner"}, schemas.POST_OUT_FIELDS)
     # Check if user exists
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+    user = await db.get(models.User, user_id)
 
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,detail="User not found")
 
-    posts = db.query(models.Post).filter(models.Post.owner_id == user_id).order_by(models.Post.created_at.desc()).offset(skip).limit(limit).all()
+    page = page_query(select(models.Post).where(models.Post.owner_id == user_id), skip, cursor, limit)
+    result = await db.execute(page.options(*load_options(models.Post, fields, schemas.POST_KEY_FIELDS)))
+    posts = list(result.scalars().all())
 
-    return posts
+    return model_response(List[schemas.PostFieldsOut], finish_page(posts, response, limit), response, fields=fields)
+
+
+@router.get("/user/{user_id}/export", response_class=StreamingResponse)
+async def export_user_posts(
+    user_id : int,
+    since : Optional[str] = Query(None, description="Resume after the `cursor` of the last exported line"),
+    db : AsyncSession = Depends(get_read_db)
+    ):
+    """Stream every post by user_id as NDJSON, oldest first
+
+    Each line carries a `cursor`; pass the last one back as `since` to export only
+    newer posts or to resume an interrupted export.
+    """
+
+    user = await db.get(models.User, user_id)
+    if not user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,detail="User not found")
 
+    query = select(
+        models.Post.id, models.Post.title, models.Post.content, models.Post.owner_id,
+        models.Post.created_at, models.Post.updated_at, models.Post.like_count
+    ).where(models.Post.owner_id == user_id)
+    if since is not None:
+        position = decode_cursor(since)
+        if position is None:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        query = query.where(tuple_(models.Post.created_at, models.Post.id) > tuple_(*position))
+    # Columns rather than entities: nothing lands in the identity map
+    query = query.order_by(models.Post.created_at, models.Post.id).execution_options(yield_per=EXPORT_BATCH_SIZE)
+
+    async def lines():
+        # Server-side cursor, only one batch of rows is held in memory at a time. The
+        # dependency's session is closed only after the response has been sent.
+        result = await db.stream(query)
+        async for rows in result.partitions():
+            yield "".join(
+                schemas.PostExport(
+                    **row._mapping,
+                    like_total=row.like_count + pending_like_counts.pending(row.id),
+                    cursor=encode_cursor(row.created_at, row.id),
+                ).model_dump_json() + "\n"
+                for row in rows
+            )
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
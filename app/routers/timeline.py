@@ -0,0 +1,44 @@
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import models, schemas
+from app.core.fields import load_options, parse_fields
+from app.core.pagination import encode_cursor, decode_cursor
+from app.core.responses import model_response
+from app.dependencies import get_current_user
+from app.database import get_read_db
+from app.services.timeline import read_timeline
+import logging
+from typing import List, Optional
+
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/timeline", tags=["timeline"])
+
+
+@router.get("/", response_model=List[schemas.PostDetailOut])
+async def get_timeline(
+    response: Response,
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor"),
+    limit: int = Query(20, ge=1, le=100),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,title,excerpt"),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: models.User = Depends(get_current_user)):
+    """Get the home timeline of the current user"""
+
+    fields = parse_fields(fields, schemas.POST_FIELDS, schemas.POST_DETAIL_FIELDS)
+    position = None
+    if cursor is not None:
+        position = decode_cursor(cursor)
+        if position is None:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+    posts = await read_timeline(
+        db, current_user.id, position, limit + 1, load_options(models.Post, fields, schemas.POST_KEY_FIELDS)
+    )
+    if len(posts) > limit:
+        posts = posts[:limit]
+        last = posts[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last.created_at, last.id)
+
+    return model_response(List[schemas.PostFieldsOut], posts, response, fields=fields)
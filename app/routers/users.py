@@ -1,9 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, status, Request, Response
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert as postgres_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from app import models, schemas
-from app.database import get_db
-from app.dependencies import get_current_user
-from app.core.security import hash_password
+from app.database import get_db, get_read_db, utcnow
+from app.dependencies import get_current_user, principal_cache
+from app.core.batch import in_requested_order, parse_ids, unique_ids
+from app.core.config import settings
+from app.core.etag import compute_etag, etag_matches, not_modified
+from app.core.responses import model_response
+from app.core.security import hash_password_async
+from app.services.timeline import backfill_followee, queue_demoted_authors, remove_followee
+from typing import List
 import logging
 
 logger = logging.getLogger(__name__)
@@ -11,29 +20,62 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/users",tags=["users"])
 
 @router.get("/me",response_model=schemas.UserOut)
-def get_current_user_info(current_user: models.User  = Depends(get_current_user)):
+async def get_current_user_info(current_user: models.User  = Depends(get_current_user)):
     """Get current user information"""
     return current_user
 
 
+async def users_batch(db: AsyncSession, ids: List[int]) -> Response:
+    """Users for `ids` in one IN query, in the order asked for; deleted accounts count as missing"""
+    result = await db.execute(select(models.User).where(models.User.id.in_(ids), models.User.deleted_at.is_(None)))
+    users, missing = in_requested_order(ids, result.scalars())
+    return model_response(schemas.UserBatchOut, schemas.UserBatchOut.model_construct(items=users, missing=missing))
+
+
+@router.get("/batch",response_model=schemas.UserBatchOut)
+async def get_users_batch(
+    ids: str = Query(..., description=f"Comma-separated user ids, at most {settings.BATCH_GET_MAX_IDS}"),
+    db: AsyncSession = Depends(get_read_db)):
+    """Several users by ID in one request"""
+    return await users_batch(db, parse_ids(ids))
+
+
+@router.post("/batch",response_model=schemas.UserBatchOut)
+async def post_users_batch(payload: schemas.BatchIds, db: AsyncSession = Depends(get_read_db)):
+    """Same as GET /batch, for id lists too long for a URL"""
+    return await users_batch(db, unique_ids(payload.ids))
+
+
 @router.get("/{user_id}",response_model=schemas.UserOut)
-def get_user(user_id:int, db: Session = Depends(get_db)):
+async def get_user(user_id:int, request: Request, response: Response, db: AsyncSession = Depends(get_read_db)):
     """Get user by ID"""
-    user = db.query(models.User).filter(models.User.id == user_id).first()
 
-    if not user:
+    # Conditional GET: version lookup only, the user row is not loaded
+    if request.headers.get("if-none-match"):
+        version = await db.execute(select(models.User.id, models.User.updated_at).where(models.User.id == user_id))
+        row = version.first()
+        if row is not None:
+            etag = compute_etag([row])
+            if etag_matches(request, etag):
+                return not_modified(etag)
+
+    user = await db.get(models.User, user_id)
+
+    if not user or user.deleted_at is not None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,detail="User not found")
     
+    response.headers["ETag"] = compute_etag([(user.id, user.updated_at)])
     return user
 
 
 @router.put("/me",response_model=schemas.UserOut)
-def update_current_user(user_update : schemas.UserUpdate, db:Session = Depends(get_db),current_user : models.User = Depends(get_current_user) ):
+async def update_current_user(user_update : schemas.UserUpdate, db:AsyncSession = Depends(get_db),current_user : models.User = Depends(get_current_user) ):
     """Update current user information"""
 
     # Check if email is already taken
     if user_update.email and user_update.email != current_user.email:
-        existing = db.query(models.User).filter(models.User.email == user_update.email).first()
+        result = await db.execute(select(models.User).where(models.User.email == user_update.email))
+        existing = result.scalars().first()
         if existing:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,detail="Email already in use")
         
@@ -45,21 +87,84 @@ def update_current_user(user_update : schemas.UserUpdate, db:Session = Depends(g
         current_user.full_name = user_update.full_name
 
     if user_update.password:
-        current_user.hashed_password = hash_password(user_update.password)
+        current_user.hashed_password = await hash_password_async(user_update.password)
 
-    db.commit()
-    db.refresh(current_user)
+    await db.commit()
+    await db.refresh(current_user)
+    principal_cache.invalidate(current_user.id)
 
     logger.info(f"User updated: {current_user.email}")
     return current_user
 
 
 @router.delete("/me",status_code=status.HTTP_204_NO_CONTENT)
-def delete_current_user(db: Session = Depends(get_db),current_user : models.User = Depends(get_current_user)):
-    """Delete current user account"""
+async def delete_current_user(db: AsyncSession = Depends(get_db),current_user : models.User = Depends(get_current_user)):
+    """Delete current user account
+
+    The account is deactivated right away; it and its posts are removed in the
+    background by the account purger, so the request stays short however many
+    posts there are.
+    """
 
-    db.delete(current_user)
-    db.commit()
+    current_user.is_active = False
+    current_user.deleted_at = utcnow()
+    await db.commit()
+    principal_cache.invalidate(current_user.id)
 
     logger.info(f"User deleted: {current_user.email}")
     return None
+
+
+@router.post("/{user_id}/follow",status_code=status.HTTP_204_NO_CONTENT)
+async def follow_user(user_id:int, db: AsyncSession = Depends(get_db),current_user : models.User = Depends(get_current_user)):
+    """Follow a user"""
+
+    if user_id == current_user.id:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,detail="Cannot follow yourself")
+
+    followee = await db.get(models.User, user_id)
+    if not followee or not followee.is_active:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,detail="User not found")
+
+    # Already following (or a concurrent request got there first), nothing to do
+    insert = postgres_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+    result = await db.execute(
+        insert(models.Follow).values(follower_id=current_user.id, followee_id=user_id)
+        .on_conflict_do_nothing(index_elements=["follower_id", "followee_id"])
+    )
+    if result.rowcount != 1:
+        await db.rollback()
+        return None
+
+    # updated_at pinned: a new follower is no edit of the followee and mustn't change their ETags
+    await db.execute(update(models.User).where(models.User.id == user_id).values(
+        follower_count=models.User.follower_count + 1, updated_at=models.User.updated_at
+    ))
+    await backfill_followee(db, current_user.id, followee)
+    await db.commit()
+    # follower_count decides fan-out for the followee's next post
+    principal_cache.invalidate(user_id)
+
+    logger.info(f"User {current_user.id} followed {user_id}")
+    return None
+
+
+@router.delete("/{user_id}/follow",status_code=status.HTTP_204_NO_CONTENT)
+async def unfollow_user(user_id:int, db: AsyncSession = Depends(get_db),current_user : models.User = Depends(get_current_user)):
+    """Unfollow a user"""
+
+    follow = await db.get(models.Follow, (current_user.id, user_id))
+    if not follow:
+        return None
+
+    await db.delete(follow)
+    await db.execute(update(models.User).where(models.User.id == user_id).values(
+        follower_count=models.User.follower_count - 1, updated_at=models.User.updated_at
+    ))
+    await queue_demoted_authors(db, [user_id])
+    await remove_followee(db, current_user.id, user_id)
+    await db.commit()
+    principal_cache.invalidate(user_id)
+
+    logger.info(f"User {current_user.id} unfollowed {user_id}")
+    return None
@@ -1,4 +1,6 @@
-from app.schemas.user import (UserBase, UserCreate, UserLogin, UserUpdate, UserOut, Token)
-from app.schemas.post import (PostBase,PostCreate, PostDetailOut, PostOut, PostUpdate)
+from app.schemas.user import (UserBase, UserCreate, UserLogin, UserUpdate, UserOut, UserBatchOut, Token)
+from app.schemas.post import (BatchIds, PostBase,PostCreate, PostBulkCreate, PostBatchOut, PostDetailOut, PostExport, PostFieldsOut, PostOut, PostUpdate,
+    POST_DETAIL_FIELDS, POST_FIELDS, POST_KEY_FIELDS, POST_OUT_FIELDS)
 
-__all__ = ["UserBase", "UserCreate","UserLogin", "UserUpdate", "UserOut", "Token","PostBase","PostCreate", "PostDetailOut", "PostOut", "PostUpdate"]
\ No newline at end of file
+__all__ = ["UserBase", "UserCreate","UserLogin", "UserUpdate", "UserOut", "UserBatchOut", "Token", "BatchIds","PostBase","PostCreate", "PostBulkCreate", "PostBatchOut", "PostDetailOut", "PostExport", "PostFieldsOut", "PostOut", "PostUpdate",
+           "POST_DETAIL_FIELDS", "POST_FIELDS", "POST_KEY_FIELDS", "POST_OUT_FIELDS"]
\ No newline at end of file
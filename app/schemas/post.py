@@ -1,6 +1,7 @@
-from pydantic import BaseModel, Field
+from pydantic import AliasChoices, BaseModel, Field
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
+from app.core.config import settings
 
 class PostBase(BaseModel):
     title: str = Field(...,min_length=1, max_length=255)
@@ -10,6 +11,13 @@ class PostBase(BaseModel):
 class PostCreate(PostBase):
     pass
 
+class PostBulkCreate(BaseModel):
+    posts: List[PostCreate] = Field(..., min_length=1, max_length=settings.BULK_POST_MAX_ITEMS)
+
+# Body of POST /users/batch and /posts/batch
+class BatchIds(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=settings.BATCH_GET_MAX_IDS)
+
 class PostUpdate(BaseModel):
     title: Optional[str] = Field(None, min_length=1, max_length=255)
     content: Optional[str] = Field(None, min_length=1, max_length=5000)
@@ -20,20 +28,47 @@ class PostOut(PostBase):
     owner_id : int
     created_at: datetime
     updated_at: datetime
+    # ORM posts expose the stored count plus unflushed likes as like_total
+    like_count: int = Field(0, validation_alias=AliasChoices("like_total", "like_count"))
 
     class Config:
         from_attributes : True
 
 
+class PostExport(PostOut):
+    # Position of this post, resume the export after it with ?since=
+    cursor: str
+
+
 class PostDetailOut(PostBase):
     id: int
     owner_id :int
     created_at: datetime
     updated_at: datetime
+    like_count: int = Field(0, validation_alias=AliasChoices("like_total", "like_count"))
     owner: "UserOut"
 
     class Config:
         from_attributes: True
 
+class PostBatchOut(BaseModel):
+    # Requested order, ids that don't exist are listed in missing
+    items: List[PostDetailOut]
+    missing: List[int]
+
 from app.schemas.user import UserOut
-PostDetailOut.model_rebuild()
\ No newline at end of file
+PostDetailOut.model_rebuild()
+PostBatchOut.model_rebuild()
+
+
+class PostFieldsOut(PostDetailOut):
+    # Everything ?fields= can pick on post lists; excerpt is the stored preview of content
+    excerpt: str
+
+
+# Field sets for ?fields= on post lists
+POST_FIELDS = frozenset(PostFieldsOut.model_fields)
+POST_DETAIL_FIELDS = frozenset(PostDetailOut.model_fields)
+POST_OUT_FIELDS = frozenset(PostOut.model_fields)
+# Loaded whatever is picked: keyset cursors, ETags and like counts need them
+POST_KEY_FIELDS = frozenset({"id", "owner_id", "created_at", "updated_at", "like_count"})
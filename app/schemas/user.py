@@ -1,6 +1,6 @@
 from pydantic import BaseModel, EmailStr, Field
 from datetime import datetime, timezone
-from typing import Optional
+from typing import List, Optional
 
 class UserBase(BaseModel):
     email : EmailStr
@@ -32,6 +32,12 @@ class UserOut(UserBase):
         from_attributes = True
 
 
+class UserBatchOut(BaseModel):
+    # Requested order, ids that don't exist (or were deleted) are listed in missing
+    items: List[UserOut]
+    missing: List[int]
+
+
 class Token(BaseModel):
     access_token:str
     token_type : str = "bearer"
@@ -0,0 +1,103 @@
+# Account deletion: DELETE /users/me only marks the account, the purger removes it later
+#
+# Deleting a prolific account inside the request removed every post, and through
+# ON DELETE CASCADE their likes and timeline entries, in one long transaction. The
+# purger deletes posts in bounded batches, each in its own short transaction, and
+# the user row once nothing is left.
+
+import asyncio
+import logging
+from typing import Optional
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from app import models
+from app.dependencies import principal_cache
+from app.services.timeline import queue_demoted_authors
+
+logger = logging.getLogger(__name__)
+
+posts_table = models.Post.__table__
+users_table = models.User.__table__
+follows_table = models.Follow.__table__
+likes_table = models.Like.__table__
+
+
+async def delete_posts_batch(db: AsyncSession, user_id: int, batch_size: int) -> int:
+    """Delete up to `batch_size` of the user's posts and commit; returns posts deleted"""
+    batch = select(posts_table.c.id).where(posts_table.c.owner_id == user_id).limit(batch_size)
+    result = await db.execute(delete(posts_table).where(posts_table.c.id.in_(batch)))
+    await db.commit()
+    return result.rowcount
+
+
+async def purge_user(db: AsyncSession, user_id: int, batch_size: int) -> Optional[int]:
+    """Delete a deleted account's posts batch by batch, then the account; returns posts deleted
+
+    None when another worker purged the account first.
+    """
+    deleted = 0
+    while True:
+        count = await delete_posts_batch(db, user_id, batch_size)
+        deleted += count
+        if count < batch_size:
+            break
+    # Likes, follows and timeline entries of the user go with ON DELETE CASCADE, so read
+    # what they counted towards first. Deleting the user row claims the account: a
+    # concurrent purge blocks on it and finds nothing to delete, so the counts below
+    # are only taken down once, in the same transaction
+    followees = (await db.execute(
+        select(follows_table.c.followee_id).where(follows_table.c.follower_id == user_id)
+    )).scalars().all()
+    liked = (await db.execute(
+        select(likes_table.c.post_id).where(likes_table.c.user_id == user_id)
+    )).scalars().all()
+    claimed = await db.execute(
+        delete(users_table).where(users_table.c.id == user_id, users_table.c.deleted_at.is_not(None))
+    )
+    if claimed.rowcount != 1:
+        await db.rollback()
+        return None
+    for offset in range(0, len(followees), batch_size):
+        await db.execute(
+            update(users_table)
+            .where(users_table.c.id.in_(followees[offset:offset + batch_size]))
+            .values(follower_count=users_table.c.follower_count - 1, updated_at=users_table.c.updated_at)
+        )
+    await queue_demoted_authors(db, followees)
+    for offset in range(0, len(liked), batch_size):
+        await db.execute(
+            update(posts_table)
+            .where(posts_table.c.id.in_(liked[offset:offset + batch_size]))
+            .values(like_count=posts_table.c.like_count - 1, updated_at=posts_table.c.updated_at)
+        )
+    await db.commit()
+    # follower_count decides fan-out for the followees' next posts
+    for followee_id in followees:
+        principal_cache.invalidate(followee_id)
+    return deleted
+
+
+async def purge_deleted_users(db: AsyncSession, batch_size: int) -> int:
+    """Purge every account marked deleted, oldest first; returns accounts purged by this call"""
+    result = await db.execute(
+        select(users_table.c.id).where(users_table.c.deleted_at.is_not(None)).order_by(users_table.c.deleted_at)
+    )
+    purged = 0
+    for user_id in result.scalars().all():
+        posts = await purge_user(db, user_id, batch_size)
+        if posts is None:
+            continue
+        purged += 1
+        logger.info(f"Purged deleted user {user_id} and {posts} posts")
+    return purged
+
+
+async def run_account_purger(sessionmaker: async_sessionmaker, interval: float, batch_size: int) -> None:
+    """Purge deleted accounts every `interval` seconds until cancelled"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with sessionmaker() as db:
+                await purge_deleted_users(db, batch_size)
+        except Exception as e:
+            logger.error(f"Purging deleted accounts failed, will retry: {e}")
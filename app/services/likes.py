@@ -0,0 +1,83 @@
+# Likes: idempotent like/unlike rows plus write-behind like_count updates
+#
+# Concurrent likes of a viral post would all queue on its row lock if each one ran
+# UPDATE posts SET like_count = like_count + 1. Instead committed likes add to an
+# in-process buffer that a background task flushes as one batched UPDATE per interval.
+
+import asyncio
+import logging
+from sqlalchemy import bindparam, delete, update
+from sqlalchemy.dialects.postgresql import insert as postgres_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from app import models
+from app.models.like import pending_like_counts
+
+logger = logging.getLogger(__name__)
+
+posts_table = models.Post.__table__
+
+
+async def like_post(db: AsyncSession, user_id: int, post_id: int) -> bool:
+    """Like a post and commit; False if the user already liked it"""
+    insert = postgres_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+    result = await db.execute(
+        insert(models.Like).values(user_id=user_id, post_id=post_id)
+        .on_conflict_do_nothing(index_elements=["user_id", "post_id"])
+    )
+    await db.commit()
+    if result.rowcount != 1:
+        return False
+    # Counted only once the like row is committed
+    pending_like_counts.add(post_id, 1)
+    return True
+
+
+async def unlike_post(db: AsyncSession, user_id: int, post_id: int) -> bool:
+    """Remove a like and commit; False if there was none"""
+    result = await db.execute(
+        delete(models.Like).where(models.Like.user_id == user_id, models.Like.post_id == post_id)
+    )
+    await db.commit()
+    if result.rowcount != 1:
+        return False
+    pending_like_counts.add(post_id, -1)
+    return True
+
+
+async def flush_like_counts(db: AsyncSession) -> int:
+    """Apply pending deltas to posts.like_count in one executemany; returns posts updated"""
+    deltas = pending_like_counts.drain()
+    if not deltas:
+        return 0
+    # Ordered by id so concurrent flushes from other workers lock rows in the same order
+    params = [{"post_key": post_id, "delta": delta} for post_id, delta in sorted(deltas.items())]
+    try:
+        await db.execute(
+            update(posts_table)
+            .where(posts_table.c.id == bindparam("post_key"))
+            # Pin updated_at, its onupdate would otherwise mark every liked post as edited
+            .values(like_count=posts_table.c.like_count + bindparam("delta"), updated_at=posts_table.c.updated_at),
+            params,
+        )
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        pending_like_counts.restore(deltas)
+        raise
+    return len(deltas)
+
+
+async def run_like_flusher(sessionmaker: async_sessionmaker, interval: float) -> None:
+    """Flush like counts every `interval` seconds until cancelled, then once more"""
+    try:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                async with sessionmaker() as db:
+                    await flush_like_counts(db)
+            except Exception as e:
+                logger.error(f"Flushing like counts failed, will retry: {e}")
+    finally:
+        async with sessionmaker() as db:
+            await flush_like_counts(db)
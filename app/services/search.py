@@ -0,0 +1,68 @@
+# Ranked full-text search over posts (Postgres tsvector / SQLite FTS5)
+
+import re
+from typing import List, Optional, Tuple
+from sqlalchemy import select, func, literal_column, tuple_, table, column
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from app import models
+
+WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+posts_fts = table("posts_fts", column("rowid"))
+
+
+def _postgres_matches(q: str):
+    query = func.websearch_to_tsquery("english", q)
+    vector = literal_column("posts.search_vector")
+    return (
+        select(models.Post.id.label("post_id"), func.ts_rank_cd(vector, query).label("rank"))
+        .where(vector.op("@@")(query))
+    )
+
+
+def _sqlite_matches(q: str):
+    # Quote every word so user input can't inject FTS5 query syntax
+    words = WORD_RE.findall(q)
+    if not words:
+        return None
+    match = " ".join(f'"{word}"' for word in words)
+    fts = literal_column("posts_fts")
+    return (
+        # bm25 is lower-is-better, negate it so both dialects rank descending
+        select(posts_fts.c.rowid.label("post_id"), (-func.bm25(fts)).label("rank"))
+        .where(fts.op("MATCH")(match))
+    )
+
+
+async def search_posts(
+    db: AsyncSession,
+    q: str,
+    position: Optional[Tuple[float, int]],
+    limit: int,
+    options: Optional[list] = None,
+) -> List[Tuple[models.Post, float]]:
+    """Posts matching `q` as (post, rank) pairs, best match first, paged on (rank, id)
+
+    `options` replaces the default loader options (posts with their owners).
+    """
+    if db.bind.dialect.name == "postgresql":
+        matches = _postgres_matches(q)
+    else:
+        matches = _sqlite_matches(q)
+        if matches is None:
+            return []
+
+    matches = matches.subquery()
+    query = (
+        select(models.Post, matches.c.rank)
+        .join(matches, matches.c.post_id == models.Post.id)
+        .options(*(options if options is not None else [joinedload(models.Post.owner)]))
+        .order_by(matches.c.rank.desc(), models.Post.id.desc())
+        .limit(limit)
+    )
+    if position is not None:
+        query = query.where(tuple_(matches.c.rank, models.Post.id) < tuple_(*position))
+
+    result = await db.execute(query)
+    return [(post, rank) for post, rank in result.all()]
@@ -0,0 +1,201 @@
+# Home timelines: fan-out on write for regular authors, fan-out on read for
+# authors with huge follower counts (celebrities)
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Iterable, List, Optional, Set, Tuple
+from sqlalchemy import select, insert, delete, exists, literal, tuple_, union, true
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import joinedload
+from app import models
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Authors an unfollow or a purge took below the threshold, waiting for the backfill.
+# Per process like the pending like counts: a crash loses what wasn't backfilled yet
+demoted_authors: Set[int] = set()
+
+
+def is_celebrity(user: models.User) -> bool:
+    """Whether posts by this user are merged in on read instead of fanned out"""
+    return (user.follower_count or 0) >= settings.FANOUT_FOLLOWER_THRESHOLD
+
+
+async def fan_out_posts(db: AsyncSession, post_ids: List[int], author: models.User) -> None:
+    """Copy new posts into the author's and their followers' timelines
+
+    Runs inside the caller's transaction; the posts must already be flushed.
+    Each step is one INSERT ... SELECT regardless of how many posts there are.
+    """
+    columns = ["user_id", "post_id", "author_id", "created_at"]
+    new_posts = (
+        select(models.Post.id, models.Post.created_at)
+        .where(models.Post.id.in_(post_ids))
+        .subquery()
+    )
+
+    own = select(literal(author.id), new_posts.c.id, literal(author.id), new_posts.c.created_at)
+    await db.execute(insert(models.TimelineEntry).from_select(columns, own))
+
+    if is_celebrity(author):
+        return
+
+    followers = (
+        select(models.Follow.follower_id, new_posts.c.id, literal(author.id), new_posts.c.created_at)
+        .join(new_posts, true())
+        .where(models.Follow.followee_id == author.id)
+    )
+    await db.execute(insert(models.TimelineEntry).from_select(columns, followers))
+
+
+async def fan_out_post(db: AsyncSession, post: models.Post, author: models.User) -> None:
+    """Copy a new post into the author's and their followers' timelines"""
+    await fan_out_posts(db, [post.id], author)
+
+
+async def backfill_followee(db: AsyncSession, follower_id: int, followee: models.User) -> None:
+    """Copy the followee's most recent posts into a new follower's timeline"""
+    if is_celebrity(followee) or settings.TIMELINE_BACKFILL_POSTS <= 0:
+        return
+
+    recent = (
+        select(literal(follower_id), models.Post.id, models.Post.owner_id, models.Post.created_at)
+        .where(models.Post.owner_id == followee.id)
+        .order_by(models.Post.created_at.desc(), models.Post.id.desc())
+        .limit(settings.TIMELINE_BACKFILL_POSTS)
+    )
+    await db.execute(insert(models.TimelineEntry).from_select(
+        ["user_id", "post_id", "author_id", "created_at"], recent
+    ))
+
+
+async def queue_demoted_authors(db: AsyncSession, author_ids: Iterable[int]) -> None:
+    """Queue the authors a lost follower just took below the threshold for backfill_demoted_authors
+
+    Call after follower_count was decremented by one. One indexed read; the backfill
+    itself runs in the background, off the request path.
+    """
+    author_ids = list(author_ids)
+    if not author_ids or settings.TIMELINE_BACKFILL_POSTS <= 0:
+        return
+    demoted = await db.execute(select(models.User.id).where(
+        models.User.id.in_(author_ids),
+        models.User.follower_count == settings.FANOUT_FOLLOWER_THRESHOLD - 1,
+    ))
+    demoted_authors.update(demoted.scalars().all())
+
+
+async def backfill_demoted_authors(db: AsyncSession) -> int:
+    """Copy the recent posts of queued authors into their followers' timelines and commit; returns authors backfilled
+
+    Posts written while an author was a celebrity were never fanned out and no longer
+    come in through the merge on read. Authors back at the threshold by now are
+    skipped, so one flapping at the boundary costs at most one backfill per run.
+    """
+    author_ids = sorted(demoted_authors)
+    demoted_authors.difference_update(author_ids)
+    if not author_ids:
+        return 0
+    entry = models.TimelineEntry
+    try:
+        still_demoted = await db.execute(select(models.User.id).where(
+            models.User.id.in_(author_ids),
+            models.User.follower_count < settings.FANOUT_FOLLOWER_THRESHOLD,
+        ))
+        backfilled = still_demoted.scalars().all()
+        for author_id in backfilled:
+            recent = (
+                select(models.Post.id, models.Post.created_at)
+                .where(models.Post.owner_id == author_id)
+                .order_by(models.Post.created_at.desc(), models.Post.id.desc())
+                .limit(settings.TIMELINE_BACKFILL_POSTS)
+                .subquery()
+            )
+            missing = (
+                select(models.Follow.follower_id, recent.c.id, literal(author_id), recent.c.created_at)
+                .join(recent, true())
+                .where(
+                    models.Follow.followee_id == author_id,
+                    ~exists().where(entry.user_id == models.Follow.follower_id, entry.post_id == recent.c.id),
+                )
+            )
+            await db.execute(insert(entry).from_select(["user_id", "post_id", "author_id", "created_at"], missing))
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        demoted_authors.update(author_ids)
+        raise
+    return len(backfilled)
+
+
+async def run_timeline_backfiller(sessionmaker: async_sessionmaker, interval: float) -> None:
+    """Backfill the queued demoted authors every `interval` seconds until cancelled"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with sessionmaker() as db:
+                await backfill_demoted_authors(db)
+        except Exception as e:
+            logger.error(f"Backfilling demoted authors failed, will retry: {e}")
+
+
+async def remove_followee(db: AsyncSession, follower_id: int, followee_id: int) -> None:
+    """Drop an unfollowed author's posts from a timeline"""
+    await db.execute(delete(models.TimelineEntry).where(
+        models.TimelineEntry.user_id == follower_id,
+        models.TimelineEntry.author_id == followee_id,
+    ))
+
+
+async def read_timeline(
+    db: AsyncSession,
+    user_id: int,
+    position: Optional[Tuple[datetime, int]],
+    limit: int,
+    options: Optional[list] = None,
+) -> List[models.Post]:
+    """Read one page of a home timeline, newest first
+
+    Materialized entries and posts from followed celebrities are merged in a
+    single statement; each branch is an indexed range read bounded by `limit`.
+    `options` replaces the default loader options (posts with their owners).
+    """
+    entry = models.TimelineEntry
+    materialized = (
+        select(entry.post_id.label("post_id"), entry.created_at.label("created_at"))
+        .where(entry.user_id == user_id)
+        .order_by(entry.created_at.desc(), entry.post_id.desc())
+        .limit(limit)
+    )
+    celebrities = (
+        select(models.Post.id.label("post_id"), models.Post.created_at.label("created_at"))
+        .join(models.Follow, models.Follow.followee_id == models.Post.owner_id)
+        .join(models.User, models.User.id == models.Follow.followee_id)
+        .where(
+            models.Follow.follower_id == user_id,
+            models.User.follower_count >= settings.FANOUT_FOLLOWER_THRESHOLD,
+        )
+        .order_by(models.Post.created_at.desc(), models.Post.id.desc())
+        .limit(limit)
+    )
+    if position is not None:
+        materialized = materialized.where(tuple_(entry.created_at, entry.post_id) < tuple_(*position))
+        celebrities = celebrities.where(tuple_(models.Post.created_at, models.Post.id) < tuple_(*position))
+
+    # UNION (not ALL) drops posts present in both branches after an author crosses the threshold
+    page = union(
+        select(materialized.subquery()),
+        select(celebrities.subquery()),
+    ).subquery()
+
+    query = (
+        select(models.Post)
+        .join(page, page.c.post_id == models.Post.id)
+        .options(*(options if options is not None else [joinedload(models.Post.owner)]))
+        .order_by(page.c.created_at.desc(), page.c.post_id.desc())
+        .limit(limit)
+    )
+    result = await db.execute(query)
+    return list(result.scalars().all())
@@ -0,0 +1,128 @@
+# Trending posts: an in-memory top-K ranking kept up to date by a background task
+#
+# Each refresh only reads posts and likes newer than the previous one (by id and
+# created_at watermarks) and rescoring covers the posts inside the window, so
+# GET /posts/trending never scores the posts table at request time. Unlikes are not
+# visible incrementally; a periodic full rebuild reconciles them.
+
+import asyncio
+import heapq
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from app import models
+from app.core.config import settings
+from app.database import utcnow
+
+logger = logging.getLogger(__name__)
+
+
+class TrendingTracker:
+    """Top-K posts by (likes + 1) / (age_hours + 2) ^ gravity over a recent window"""
+
+    def __init__(self, size: int, window: timedelta, gravity: float):
+        self.size = size
+        self.window = window
+        self.gravity = gravity
+        self.reset()
+
+    def reset(self) -> None:
+        # post id -> [created_at, likes] for posts inside the window
+        self._candidates: Dict[int, list] = {}
+        self._last_post_id = 0
+        self._last_like_at: Optional[datetime] = None
+        self._top: List[Tuple[int, float]] = []
+        self.refreshed_at: Optional[datetime] = None
+
+    def top(self, limit: int) -> List[Tuple[int, float]]:
+        """Highest ranked (post id, score) pairs"""
+        return self._top[:limit]
+
+    def score(self, created_at: datetime, likes: int, now: datetime) -> float:
+        age_hours = max(0.0, (now - created_at).total_seconds() / 3600)
+        return (likes + 1) / (age_hours + 2) ** self.gravity
+
+    async def rebuild(self, db: AsyncSession, now: datetime) -> None:
+        """Recompute candidates and like counts for the whole window"""
+        cutoff = now - self.window
+        last_post_id = await db.scalar(select(func.max(models.Post.id)))
+        last_like_at = await db.scalar(select(func.max(models.Like.created_at)))
+
+        posts = await db.execute(select(models.Post.id, models.Post.created_at).where(models.Post.created_at >= cutoff))
+        candidates = {post_id: [created_at, 0] for post_id, created_at in posts}
+        likes = await db.execute(
+            select(models.Like.post_id, func.count())
+            .join(models.Post, models.Post.id == models.Like.post_id)
+            .where(models.Post.created_at >= cutoff)
+            .group_by(models.Like.post_id)
+        )
+        for post_id, count in likes:
+            if post_id in candidates:
+                candidates[post_id][1] = count
+
+        self._candidates = candidates
+        self._last_post_id = last_post_id or 0
+        self._last_like_at = last_like_at
+        self._rescore(now)
+
+    async def update(self, db: AsyncSession, now: datetime) -> None:
+        """Fold in posts and likes created since the previous refresh"""
+        cutoff = now - self.window
+        posts = await db.execute(
+            select(models.Post.id, models.Post.created_at).where(models.Post.id > self._last_post_id)
+        )
+        for post_id, created_at in posts:
+            self._last_post_id = max(self._last_post_id, post_id)
+            if created_at >= cutoff:
+                self._candidates[post_id] = [created_at, 0]
+
+        likes = select(models.Like.post_id, func.count(), func.max(models.Like.created_at)).group_by(models.Like.post_id)
+        if self._last_like_at is not None:
+            likes = likes.where(models.Like.created_at > self._last_like_at)
+        for post_id, count, last_like_at in await db.execute(likes):
+            if self._last_like_at is None or last_like_at > self._last_like_at:
+                self._last_like_at = last_like_at
+            if post_id in self._candidates:
+                self._candidates[post_id][1] += count
+
+        self._candidates = {
+            post_id: entry for post_id, entry in self._candidates.items() if entry[0] >= cutoff
+        }
+        self._rescore(now)
+
+    def _rescore(self, now: datetime) -> None:
+        best = heapq.nlargest(
+            self.size,
+            ((self.score(created_at, likes, now), post_id) for post_id, (created_at, likes) in self._candidates.items()),
+        )
+        self._top = [(post_id, score) for score, post_id in best]
+        self.refreshed_at = now
+
+
+trending = TrendingTracker(
+    settings.TRENDING_SIZE, timedelta(hours=settings.TRENDING_WINDOW_HOURS), settings.TRENDING_GRAVITY
+)
+
+
+async def run_trending_refresher(
+    sessionmaker: async_sessionmaker,
+    tracker: TrendingTracker,
+    interval: float,
+    rebuild_interval: float,
+) -> None:
+    """Refresh the ranking every `interval` seconds, fully rebuilding every `rebuild_interval`"""
+    last_rebuild = None
+    while True:
+        try:
+            async with sessionmaker() as db:
+                if last_rebuild is None or time.monotonic() - last_rebuild >= rebuild_interval:
+                    await tracker.rebuild(db, utcnow())
+                    last_rebuild = time.monotonic()
+                else:
+                    await tracker.update(db, utcnow())
+        except Exception as e:
+            logger.error(f"Refreshing trending posts failed, will retry: {e}")
+        await asyncio.sleep(interval)
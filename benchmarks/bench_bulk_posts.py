@@ -0,0 +1,80 @@
+"""POST /posts/bulk vs. one POST /posts/ per post
+
+Creates the same number of posts both ways, in-process against a throwaway
+SQLite database, and reports posts per second.
+
+Usage:
+    python -m benchmarks.bench_bulk_posts -n 1000 --batch 100
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import time
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.gettempdir()}/bench_bulk_posts.db")
+os.environ.setdefault("SECRET_KEY", "bench")
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+import httpx
+
+from app.main import app
+from app.database import Base, engine
+
+
+async def login(client: httpx.AsyncClient) -> dict:
+    credentials = {"username": "bench", "password": "password123"}
+    await client.post("/api/v1/auth/register", json={"email": "bench@bench.com", **credentials})
+    response = await client.post("/api/v1/auth/login", data=credentials)
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def per_post(client: httpx.AsyncClient, headers: dict, total: int) -> float:
+    started = time.perf_counter()
+    for i in range(total):
+        response = await client.post("/api/v1/posts/", json={"title": f"Post {i}", "content": "x" * 200}, headers=headers)
+        response.raise_for_status()
+    return time.perf_counter() - started
+
+
+async def bulk(client: httpx.AsyncClient, headers: dict, total: int, batch: int) -> float:
+    started = time.perf_counter()
+    for offset in range(0, total, batch):
+        posts = [{"title": f"Post {i}", "content": "x" * 200} for i in range(offset, min(total, offset + batch))]
+        response = await client.post("/api/v1/posts/bulk", json={"posts": posts}, headers=headers)
+        response.raise_for_status()
+    return time.perf_counter() - started
+
+
+async def main_async(args) -> dict:
+    logging.getLogger().setLevel(logging.WARNING)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    async with httpx.AsyncClient(app=app, base_url="http://bench") as client:
+        headers = await login(client)
+        single_seconds = await per_post(client, headers, args.requests)
+        bulk_seconds = await bulk(client, headers, args.requests, args.batch)
+
+    return {
+        "posts": args.requests,
+        "batch": args.batch,
+        "per_post_posts_per_sec": round(args.requests / single_seconds, 1),
+        "bulk_posts_per_sec": round(args.requests / bulk_seconds, 1),
+        "speedup": round(single_seconds / bulk_seconds, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--requests", type=int, default=1000)
+    parser.add_argument("--batch", type=int, default=100)
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(main_async(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
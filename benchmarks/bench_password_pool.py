@@ -0,0 +1,78 @@
+"""Login throughput vs. password hashing pool size
+
+Drives POST /auth/login in-process against a throwaway SQLite database.
+
+Usage:
+    python -m benchmarks.bench_password_pool --workers 1 2 4 8 -n 200 -c 32
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import time
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.gettempdir()}/bench_password_pool.db")
+os.environ.setdefault("SECRET_KEY", "bench")
+
+import httpx
+
+from app.main import app
+from app.database import Base, engine
+from app.core.security import configure_hash_executor, shutdown_hash_executor
+from benchmarks.http_load import percentile
+
+CREDENTIALS = {"username": "bench", "password": "password123"}
+
+
+async def run_logins(client: httpx.AsyncClient, total: int, concurrency: int) -> dict:
+    latencies = []
+    remaining = iter(range(total))
+
+    async def worker():
+        for _ in remaining:
+            start = time.perf_counter()
+            response = await client.post("/api/v1/auth/login", data=CREDENTIALS)
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "rps": round(total / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+async def main_async(args) -> list:
+    logging.getLogger().setLevel(logging.WARNING)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    results = []
+    async with httpx.AsyncClient(app=app, base_url="http://bench") as client:
+        await client.post("/api/v1/auth/register", json={"email": "bench@bench.com", **CREDENTIALS})
+        for workers in args.workers:
+            configure_hash_executor(args.executor, workers)
+            stats = await run_logins(client, args.requests, args.concurrency)
+            results.append({"executor": args.executor, "workers": workers, **stats})
+    shutdown_hash_executor()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--executor", choices=["thread", "process"], default="thread")
+    parser.add_argument("-n", "--requests", type=int, default=200)
+    parser.add_argument("-c", "--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(main_async(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""FastAPI response_model serialization vs. model_response for a page of posts
+
+Serializes the same page of ORM posts (with owners) the way FastAPI does for a
+response_model route and with app.core.responses.model_response, and reports
+microseconds per page.
+
+Usage:
+    python -m benchmarks.bench_serialization --items 100 -n 2000
+"""
+import argparse
+import asyncio
+import json
+import os
+import timeit
+from typing import List
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "bench")
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app import models, schemas
+from app.core.responses import render_model
+from app.database import utcnow
+
+
+def make_page(items: int) -> List[models.Post]:
+    now = utcnow()
+    owners = [
+        models.User(id=i, email=f"user{i}@bench.com", username=f"user{i}", full_name=f"User {i}",
+                    hashed_password="x", is_active=True, follower_count=i, created_at=now, updated_at=now)
+        for i in range(10)
+    ]
+    return [
+        models.Post(id=i, title=f"Post {i}", content="lorem ipsum " * 40, owner_id=owners[i % 10].id,
+                    owner=owners[i % 10], like_count=i, created_at=now, updated_at=now)
+        for i in range(items)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("-n", "--number", type=int, default=2000)
+    args = parser.parse_args()
+
+    page = make_page(args.items)
+    schema = List[schemas.PostDetailOut]
+    field = create_response_field(name="bench", type_=schema)
+    loop = asyncio.new_event_loop()
+
+    def fastapi_path(response_class):
+        content = loop.run_until_complete(serialize_response(field=field, response_content=page))
+        return response_class(content).body
+
+    candidates = {
+        "response_model_json": lambda: fastapi_path(JSONResponse),
+        "response_model_orjson": lambda: fastapi_path(ORJSONResponse),
+        "model_response": lambda: render_model(schema, page),
+    }
+    # Same document either way
+    baseline = json.loads(candidates["response_model_json"]())
+    assert all(json.loads(render()) == baseline for render in candidates.values())
+
+    results = {}
+    for name, render in candidates.items():
+        seconds = min(timeit.repeat(render, number=args.number, repeat=3)) / args.number
+        results[f"{name}_us"] = round(seconds * 1e6, 1)
+    results["speedup_vs_json"] = round(results["response_model_json_us"] / results["model_response_us"], 2)
+    print(json.dumps({"items": args.items, **results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
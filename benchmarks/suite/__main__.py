@@ -0,0 +1,62 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+
+from benchmarks.suite import __doc__ as DOC
+from benchmarks.suite.database import choose_database_url
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=DOC.splitlines()[0])
+    parser.add_argument("--database-url", help="Target database (dropped and recreated)")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--posts", type=int, default=10000)
+    parser.add_argument("-c", "--concurrency", type=int, default=20)
+    parser.add_argument("-n", "--requests", type=int, default=500, help="Requests per scenario")
+    parser.add_argument("--auth-requests", type=int, default=50, help="Requests for register/login (bcrypt bound)")
+    parser.add_argument("--depth", type=int, default=50, help="Pages walked by the deep paging scenarios")
+    parser.add_argument("--scenario", action="append", help="Run only these scenarios (repeatable)")
+    return parser.parse_args()
+
+
+async def main_async(args) -> dict:
+    # Imported after DATABASE_URL is set, the app reads settings at import time
+    import httpx
+    from app.database import async_engine
+    from app.main import app
+    from benchmarks.suite.runner import run_scenario
+    from benchmarks.suite.scenarios import AUTH_SCENARIOS, SCENARIOS, Context
+    from benchmarks.suite.seed import seed
+
+    logging.getLogger().setLevel(logging.WARNING)
+    names = args.scenario or list(SCENARIOS)
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        raise SystemExit(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    report = {"database": async_engine.dialect.name, "concurrency": args.concurrency}
+    report.update(seed(args.users, args.posts))
+    ctx = Context(args.users, args.posts, args.depth)
+
+    results = {}
+    async with httpx.AsyncClient(app=app, base_url="http://bench") as client:
+        for name in names:
+            requests = args.auth_requests if name in AUTH_SCENARIOS else args.requests
+            results[name] = await run_scenario(client, SCENARIOS[name], ctx, requests, args.concurrency)
+    report["scenarios"] = results
+    return report
+
+
+def main():
+    args = parse_args()
+    os.environ["DATABASE_URL"] = choose_database_url(args.database_url)
+    os.environ.setdefault("SECRET_KEY", "bench")
+    # Measure the request path, not the limiters
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    print(json.dumps(asyncio.run(main_async(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
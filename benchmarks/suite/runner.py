@@ -0,0 +1,39 @@
+import asyncio
+import time
+from typing import List
+
+import httpx
+
+from benchmarks.http_load import percentile
+from benchmarks.suite.scenarios import Context, Scenario
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario, ctx: Context, requests: int, concurrency: int) -> dict:
+    """Issue `requests` calls of a scenario from `concurrency` closed-loop workers"""
+    latencies: List[float] = []
+    errors = 0
+    next_request = iter(range(requests))
+
+    async def worker(worker_id: int):
+        nonlocal errors
+        for i in next_request:
+            start = time.perf_counter()
+            try:
+                response = await scenario(client, ctx, worker_id, i)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(w) for w in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
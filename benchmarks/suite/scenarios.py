@@ -0,0 +1,100 @@
+import random
+from typing import Awaitable, Callable, Dict
+
+import httpx
+
+from app.core.security import create_access_token
+from benchmarks.suite.seed import PASSWORD, user_email
+
+API = "/api/v1"
+PAGE_SIZE = 20
+
+
+class Context:
+    """Seeded dataset shared by the scenarios"""
+
+    def __init__(self, users: int, posts: int, depth: int):
+        self.users = users
+        self.posts = posts
+        self.depth = depth
+        self.rng = random.Random(1)
+        self.run_id = random.getrandbits(32)
+        # Tokens are minted directly so authenticated scenarios don't pay for a login each
+        self.tokens = {}
+        # Per-worker cursor chains for deep paging
+        self.cursors: Dict[int, list] = {}
+
+    def auth_headers(self, user_id: int) -> dict:
+        if user_id not in self.tokens:
+            self.tokens[user_id] = create_access_token({"sub": str(user_id)})
+        return {"Authorization": f"Bearer {self.tokens[user_id]}"}
+
+    def random_user(self) -> int:
+        return self.rng.randint(1, self.users)
+
+
+Scenario = Callable[[httpx.AsyncClient, Context, int, int], Awaitable[httpx.Response]]
+
+
+async def register(client: httpx.AsyncClient, ctx: Context, worker: int, i: int) -> httpx.Response:
+    username = f"reg{ctx.run_id}x{i}"
+    return await client.post(f"{API}/auth/register", json={
+        "email": f"{username}@bench.com", "username": username, "password": PASSWORD,
+    })
+
+
+async def login(client: httpx.AsyncClient, ctx: Context, worker: int, i: int) -> httpx.Response:
+    return await client.post(f"{API}/auth/login", data={
+        "username": user_email(ctx.random_user() - 1), "password": PASSWORD,
+    })
+
+
+async def create_post(client: httpx.AsyncClient, ctx: Context, worker: int, i: int) -> httpx.Response:
+    return await client.post(
+        f"{API}/posts/",
+        json={"title": f"Bench {i}", "content": "Created by the benchmark suite"},
+        headers=ctx.auth_headers(ctx.random_user()),
+    )
+
+
+async def feed(client: httpx.AsyncClient, ctx: Context, worker: int, i: int) -> httpx.Response:
+    return await client.get(f"{API}/posts/", params={"limit": PAGE_SIZE})
+
+
+async def get_post(client: httpx.AsyncClient, ctx: Context, worker: int, i: int) -> httpx.Response:
+    return await client.get(f"{API}/posts/{ctx.rng.randint(1, ctx.posts)}")
+
+
+async def deep_paging(client: httpx.AsyncClient, ctx: Context, worker: int, i: int) -> httpx.Response:
+    """One page per call, each worker walking X-Next-Cursor up to `depth` pages before restarting"""
+    chain = ctx.cursors.setdefault(worker, [])
+    params = {"limit": PAGE_SIZE}
+    if chain:
+        params["cursor"] = chain[-1]
+    response = await client.get(f"{API}/posts/", params=params)
+    next_cursor = response.headers.get("X-Next-Cursor")
+    if next_cursor and len(chain) < ctx.depth:
+        chain.append(next_cursor)
+    else:
+        chain.clear()
+    return response
+
+
+async def deep_offset(client: httpx.AsyncClient, ctx: Context, worker: int, i: int) -> httpx.Response:
+    """Same depth reached with the legacy skip parameter, for comparison with deep_paging"""
+    skip = ctx.rng.randint(0, ctx.depth) * PAGE_SIZE
+    return await client.get(f"{API}/posts/", params={"limit": PAGE_SIZE, "skip": skip})
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    "register": register,
+    "login": login,
+    "create_post": create_post,
+    "feed": feed,
+    "get_post": get_post,
+    "deep_paging": deep_paging,
+    "deep_offset": deep_offset,
+}
+
+# bcrypt bound scenarios, run with --auth-requests instead of --requests
+AUTH_SCENARIOS = {"register", "login"}
@@ -0,0 +1,64 @@
+import random
+import time
+from datetime import timedelta
+
+from sqlalchemy import insert
+
+from app.core.security import hash_password
+from app.database import Base, engine, utcnow
+from app.models import Post, User
+from app.models.post import make_excerpt
+
+PASSWORD = "password123"
+CHUNK_SIZE = 1000
+
+
+def post_content(i: int) -> str:
+    return f"Benchmark post {i} " + "lorem ipsum " * 10
+
+
+def user_email(i: int) -> str:
+    return f"user{i}@bench.com"
+
+
+def seed(users: int, posts: int) -> dict:
+    """Recreate the schema and bulk insert users and posts; returns timings"""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    started = time.perf_counter()
+    # One bcrypt hash shared by every seeded user, hashing each would dominate seeding
+    hashed_password = hash_password(PASSWORD)
+    with engine.begin() as conn:
+        for offset in range(0, users, CHUNK_SIZE):
+            conn.execute(insert(User), [
+                {"email": user_email(i), "username": f"user{i}", "hashed_password": hashed_password}
+                for i in range(offset, min(users, offset + CHUNK_SIZE))
+            ])
+    users_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    rng = random.Random(0)
+    # Spread posts over time so pages have distinct (created_at, id) positions
+    newest = utcnow()
+    with engine.begin() as conn:
+        for offset in range(0, posts, CHUNK_SIZE):
+            conn.execute(insert(Post), [
+                {
+                    "title": f"Post {i}",
+                    "content": post_content(i),
+                    "excerpt": make_excerpt(post_content(i)),
+                    "owner_id": rng.randint(1, users),
+                    "created_at": newest - timedelta(seconds=posts - i),
+                    "updated_at": newest - timedelta(seconds=posts - i),
+                }
+                for i in range(offset, min(posts, offset + CHUNK_SIZE))
+            ])
+    posts_seconds = time.perf_counter() - started
+
+    return {
+        "users": users,
+        "posts": posts,
+        "seed_users_seconds": round(users_seconds, 3),
+        "seed_posts_seconds": round(posts_seconds, 3),
+    }
@@ -1,23 +1,52 @@
+import os
+# Cheap bcrypt work factor for tests, must be set before the app is imported
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+# TestClient connects as "testclient"; trust it like the proxy in front of the app
+os.environ.setdefault("FORWARDED_ALLOW_IPS", '["testclient"]')
+
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from app.main import app
-from app.database import Base, get_db
+from app.core.metrics import install_query_accounting
+from app.core.slow_query import install_slow_query_log
+from app.database import Base, enable_sqlite_foreign_keys, get_db, get_read_db, get_async_database_url
+from app.dependencies import principal_cache
+from app.dependencies.rate_limit import reset_rate_limiters
+from app.models.like import pending_like_counts
+from app.services.timeline import demoted_authors
+from app.services.trending import trending
 
-# Test database (SQLite in-memory)
-SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+# Test database (SQLite via aiosqlite by default, set TEST_DATABASE_URL to use Postgres)
+SQLALCHEMY_DATABASE_URL = os.getenv("TEST_DATABASE_URL", "sqlite:///./test.db")
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+connect_args = {"check_same_thread": False} if SQLALCHEMY_DATABASE_URL.startswith("sqlite") else {}
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args=connect_args)
+enable_sqlite_foreign_keys(engine)
 
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush= False, bind=engine)
 
+# TestClient runs every request on its own event loop, so don't pool async connections
+async_engine = create_async_engine(get_async_database_url(SQLALCHEMY_DATABASE_URL), poolclass=NullPool)
+install_query_accounting(async_engine.sync_engine)
+install_slow_query_log(async_engine.sync_engine)
+enable_sqlite_foreign_keys(async_engine.sync_engine)
+
+TestingAsyncSessionLocal = async_sessionmaker(bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 
 @pytest.fixture
 def session():
     """Create a fresh database for each test"""
+    # User ids are reused across tests, drop principals cached by the previous one
+    principal_cache.clear()
+    reset_rate_limiters()
+    pending_like_counts.clear()
+    demoted_authors.clear()
+    trending.reset()
     Base.metadata.drop_all(bind=engine)
     Base.metadata.create_all(bind=engine)
     db = TestingSessionLocal()
@@ -30,11 +59,23 @@ def session():
 @pytest.fixture
 def client(session):
     """Create a test client"""
-    def override_get_db():
-        try:
-            yield session
-        finally:
-            session.close()
+    async def override_get_db():
+        async with TestingAsyncSessionLocal() as db:
+            yield db
 
     app.dependency_overrides[get_db] = override_get_db
-    yield TestClient(app)
\ No newline at end of file
+    app.dependency_overrides[get_read_db] = override_get_db
+    yield TestClient(app)
+
+
+@pytest.fixture
+def query_counter():
+    """Count SQL statements executed by the app against the test database"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
@@ -0,0 +1,94 @@
+import asyncio
+import pytest
+from app import models
+from app.services.accounts import purge_deleted_users, purge_user
+from tests.conftest import TestingAsyncSessionLocal
+
+
+@pytest.fixture
+def authorized_client(client):
+    client.post("/api/v1/auth/register", json={"email": "leaver@test.com", "username": "leaver", "password": "password123"})
+    token = client.post(
+        "/api/v1/auth/login", data={"username": "leaver@test.com", "password": "password123"}
+    ).json()["access_token"]
+    client.headers = {**client.headers, "Authorization": f"Bearer {token}"}
+    return client
+
+
+def purge(batch_size):
+    async def run():
+        async with TestingAsyncSessionLocal() as db:
+            return await purge_deleted_users(db, batch_size)
+    return asyncio.run(run())
+
+
+def test_delete_deactivates_then_purge_removes_in_batches(authorized_client, session, query_counter):
+    user_id = authorized_client.get("/api/v1/users/me").json()["id"]
+    post_ids = [
+        authorized_client.post("/api/v1/posts", json={"title": f"Post {i}", "content": "Content"}).json()["id"]
+        for i in range(5)
+    ]
+    fan = models.User(email="fan@test.com", username="fanuser", hashed_password="x", follower_count=1)
+    session.add(fan)
+    session.flush()
+    fan_post = models.Post(title="Fan post", content="Content", owner_id=fan.id, like_count=1)
+    session.add(fan_post)
+    session.flush()
+    session.add_all([
+        models.Like(user_id=fan.id, post_id=post_ids[0]),
+        models.Follow(follower_id=fan.id, followee_id=user_id),
+        # The leaving user's own follow and like, counted on the fan's side
+        models.Follow(follower_id=user_id, followee_id=fan.id),
+        models.Like(user_id=user_id, post_id=fan_post.id),
+    ])
+    session.commit()
+    fan_updated_at, fan_post_updated_at = fan.updated_at, fan_post.updated_at
+
+    assert authorized_client.delete("/api/v1/users/me").status_code == 204
+
+    # Gone for the API right away, rows still there until purged
+    assert authorized_client.get(f"/api/v1/users/{user_id}").status_code == 404
+    login = authorized_client.post("/api/v1/auth/login", data={"username": "leaver", "password": "password123"})
+    assert login.status_code == 401
+    assert session.query(models.Post).filter_by(owner_id=user_id).count() == 5
+
+    query_counter.clear()
+    assert purge(batch_size=2) == 1
+
+    post_deletes = [s for s in query_counter if s.startswith("DELETE FROM posts")]
+    assert len(post_deletes) == 3
+    session.expire_all()
+    assert session.get(models.User, user_id) is None
+    assert session.query(models.Post).count() == 1
+    assert session.query(models.Like).count() == 0
+    assert session.query(models.Follow).count() == 0
+    assert session.get(models.User, fan.id).follower_count == 0
+    assert session.get(models.Post, fan_post.id).like_count == 0
+    assert session.get(models.User, fan.id).updated_at == fan_updated_at
+    assert session.get(models.Post, fan_post.id).updated_at == fan_post_updated_at
+    assert purge(batch_size=2) == 0
+
+
+def test_purge_leaves_counts_alone_when_account_already_claimed(session):
+    fan = models.User(email="fan@test.com", username="fanuser", hashed_password="x", follower_count=1)
+    # Not (or no longer) marked deleted, as when another worker got to the row first
+    other = models.User(email="other@test.com", username="other", hashed_password="x")
+    session.add_all([fan, other])
+    session.flush()
+    fan_post = models.Post(title="Fan post", content="Content", owner_id=fan.id, like_count=1)
+    session.add(fan_post)
+    session.flush()
+    session.add_all([
+        models.Follow(follower_id=other.id, followee_id=fan.id),
+        models.Like(user_id=other.id, post_id=fan_post.id),
+    ])
+    session.commit()
+
+    async def run():
+        async with TestingAsyncSessionLocal() as db:
+            return await purge_user(db, other.id, batch_size=2)
+
+    assert asyncio.run(run()) is None
+    session.expire_all()
+    assert session.get(models.User, fan.id).follower_count == 1
+    assert session.get(models.Post, fan_post.id).like_count == 1
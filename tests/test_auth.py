@@ -145,4 +145,21 @@ def test_login_success(client):
 def test_login_wrong_password(client):
     client.post("/api/v1/auth/register", json={"email": "test@test.com", "username": "testuser", "password": "password123"})
     response = client.post("/api/v1/auth/login", data={"username": "test@test.com", "password": "wrongpass"})
-    assert response.status_code == 401
\ No newline at end of file
+    assert response.status_code == 401
+
+def test_login_upgrades_outdated_hash(client, session):
+    from passlib.context import CryptContext
+    from app import models
+
+    old_hash = CryptContext(schemes=["bcrypt"], bcrypt__rounds=5).hash("password123")
+    session.add(models.User(email="old@test.com", username="olduser", hashed_password=old_hash))
+    session.commit()
+
+    response = client.post("/api/v1/auth/login", data={"username": "olduser", "password": "password123"})
+    assert response.status_code == 200
+
+    session.expire_all()
+    upgraded = session.query(models.User).filter(models.User.username == "olduser").one().hashed_password
+    assert upgraded != old_hash
+    assert upgraded.startswith("$2b$04$")
+    assert client.post("/api/v1/auth/login", data={"username": "olduser", "password": "password123"}).status_code == 200
@@ -0,0 +1,108 @@
+import json
+from sqlalchemy import inspect
+from app import models
+from app.cli import bulk_import
+from app.cli.bulk_import import import_file
+from app.core.security import hash_password, verify_password
+from tests.conftest import engine
+
+
+def write_ndjson(path, records):
+    path.write_text("\n".join(json.dumps(r) for r in records) + "\n")
+    return str(path)
+
+
+def test_import_users_hashes_or_keeps_passwords(session, tmp_path):
+    existing_hash = hash_password("prehashed123")
+    path = write_ndjson(tmp_path / "users.ndjson", [
+        {"email": "a@test.com", "username": "alice", "password": "password123"},
+        {"email": "b@test.com", "username": "bob", "hashed_password": existing_hash, "created_at": "2020-01-01T00:00:00+02:00"},
+        {"email": "c@test.com", "username": "carol", "hashed_password": "not-a-hash"},
+        {"email": "d@test.com", "password": "password123"},
+        {"email": "e@test.com", "username": "erin", "password": "password123", "created_at": "yesterday"},
+    ])
+
+    summary = import_file(engine, "users", path, chunk_size=2)
+
+    assert (summary["loaded"], summary["rejected"]) == (2, 3)
+    alice = session.query(models.User).filter_by(username="alice").one()
+    bob = session.query(models.User).filter_by(username="bob").one()
+    assert verify_password("password123", alice.hashed_password)
+    assert bob.hashed_password == existing_hash
+    assert bob.created_at.isoformat() == "2019-12-31T22:00:00"
+    assert alice.is_active and alice.follower_count == 0
+
+
+def test_import_posts_resolves_owners_from_csv(session, tmp_path):
+    session.add_all([
+        models.User(email="a@test.com", username="alice", hashed_password="x"),
+        models.User(email="b@test.com", username="bob", hashed_password="x"),
+    ])
+    session.commit()
+    path = tmp_path / "posts.csv"
+    path.write_text(
+        "title,content,owner\n"
+        "First,\"Hello, world\",alice\n"
+        "Second,Line one,b@test.com\n"
+        "Third,Nobody,mallory\n"
+    )
+    with_ids = write_ndjson(tmp_path / "posts.ndjson", [
+        {"title": "Bad owner", "content": "x", "owner_id": "alice"},
+        {"title": "Bad date", "content": "x", "owner": "alice", "created_at": "2020-13-45"},
+    ])
+    assert import_file(engine, "posts", with_ids)["rejected"] == 2
+
+    summary = import_file(engine, "posts", str(path), chunk_size=2, rebuild_indexes=True)
+
+    assert (summary["loaded"], summary["rejected"]) == (2, 1)
+    posts = {p.title: p for p in session.query(models.Post).all()}
+    assert posts["First"].content == "Hello, world"
+    assert posts["First"].owner.username == "alice"
+    assert posts["Second"].owner.username == "bob"
+    # Indexes dropped for the load are back
+    names = {index["name"] for index in inspect(engine).get_indexes("posts")}
+    assert {index.name for index in models.Post.__table__.indexes} <= names
+
+
+def test_import_users_duplicate_fails_only_its_chunk(session, tmp_path):
+    session.add(models.User(email="taken@test.com", username="taken", hashed_password="x"))
+    session.commit()
+    path = write_ndjson(tmp_path / "users.ndjson", [
+        {"email": "a@test.com", "username": "alice", "password": "password123"},
+        {"email": "taken@test.com", "username": "other", "password": "password123"},
+        {"email": "c@test.com", "username": "carol", "password": "password123"},
+        {"email": "d@test.com", "username": "dave"},
+    ])
+
+    summary = import_file(engine, "users", path, chunk_size=2)
+
+    assert (summary["loaded"], summary["rejected"], summary["failed"]) == (1, 1, 2)
+    usernames = {u.username for u in session.query(models.User).all()}
+    assert usernames == {"taken", "carol"}
+
+
+def test_import_duplicate_through_raw_cursor_fails_only_its_chunk(session, tmp_path, monkeypatch):
+    # COPY on Postgres writes through the DBAPI cursor, whose errors SQLAlchemy doesn't wrap
+    def raw_load_rows(conn, table, columns, rows):
+        cursor = conn.connection.cursor()
+        try:
+            cursor.executemany(
+                f"INSERT INTO {table.name} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})",
+                [tuple(row[column] for column in columns) for row in rows],
+            )
+        finally:
+            cursor.close()
+
+    if engine.dialect.name == "sqlite":
+        monkeypatch.setattr(bulk_import, "load_rows", raw_load_rows)
+    session.add(models.User(email="taken@test.com", username="taken", hashed_password="x"))
+    session.commit()
+    path = write_ndjson(tmp_path / "users.ndjson", [
+        {"email": "taken@test.com", "username": "other", "password": "password123"},
+        {"email": "c@test.com", "username": "carol", "password": "password123"},
+    ])
+
+    summary = import_file(engine, "users", path, chunk_size=1)
+
+    assert (summary["loaded"], summary["failed"]) == (1, 1)
+    assert {u.username for u in session.query(models.User).all()} == {"taken", "carol"}
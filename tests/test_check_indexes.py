@@ -0,0 +1,37 @@
+from sqlalchemy import Column, Index, Integer, MetaData, String, Table, UniqueConstraint
+from app.cli.check_indexes import database_indexes, metadata_indexes, redundant_indexes
+from app.database import Base
+from tests.conftest import engine
+
+
+def flagged(indexes):
+    return sorted((index.name, wider.name) for index, wider in redundant_indexes(indexes))
+
+
+def test_flags_duplicates_and_prefixes():
+    metadata = MetaData()
+    Table(
+        "things", metadata,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("code", String(10), nullable=False),
+        Column("owner_id", Integer, index=True),
+        Column("created_at", Integer),
+        UniqueConstraint("code", name="uq_code"),
+        Index("idx_code", "code"),
+        Index("idx_owner_created", "owner_id", "created_at"),
+        Index("idx_owner_created_copy", "owner_id", "created_at"),
+        # Unique on a prefix still enforces something the wider index doesn't
+        Index("uq_owner", "owner_id", unique=True),
+    )
+
+    assert flagged(metadata_indexes(metadata)) == [
+        ("idx_code", "uq_code"),
+        ("idx_owner_created_copy", "idx_owner_created"),
+        ("ix_things_id", "pk"),
+        ("ix_things_owner_id", "idx_owner_created"),
+    ]
+
+
+def test_app_schema_has_no_redundant_indexes(session):
+    assert redundant_indexes(metadata_indexes(Base.metadata)) == []
+    assert redundant_indexes(database_indexes(engine)) == []
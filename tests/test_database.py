@@ -0,0 +1,132 @@
+import asyncio
+import sqlite3
+import pytest
+from sqlalchemy import text
+from app.database import ReplicaRouter, get_async_database_url
+
+
+def make_replica(path, name):
+    conn = sqlite3.connect(path)
+    conn.execute("DROP TABLE IF EXISTS marker")
+    conn.execute("CREATE TABLE marker (name TEXT)")
+    conn.execute("INSERT INTO marker VALUES (?)", (name,))
+    conn.commit()
+    conn.close()
+    return f"sqlite:///{path}"
+
+
+@pytest.fixture
+def make_router():
+    """ReplicaRouter factory; the replica engines are disposed after the test"""
+    routers = []
+
+    def make(urls, **options):
+        options = {"sticky_seconds": 5, "retry_seconds": 30, **options}
+        routers.append(ReplicaRouter(urls, **options))
+        return routers[-1]
+
+    yield make
+
+    async def dispose():
+        for router in routers:
+            for engine in router.engines:
+                await engine.dispose()
+
+    asyncio.run(dispose())
+
+
+async def read_marker(router, user_id=None, cookie=None):
+    db = await router.connect(user_id, cookie)
+    if db is None:
+        return "primary"
+    async with db:
+        return (await db.execute(text("SELECT name FROM marker"))).scalar()
+
+
+def test_get_async_database_url():
+    assert get_async_database_url("postgresql://u:p@host/db") == "postgresql+asyncpg://u:p@host/db"
+    assert get_async_database_url("sqlite:///./test.db") == "sqlite+aiosqlite:///./test.db"
+
+
+def test_replicas_round_robin(tmp_path, make_router):
+    urls = [make_replica(tmp_path / "r1.db", "r1"), make_replica(tmp_path / "r2.db", "r2")]
+    router = make_router(urls)
+
+    async def run():
+        return [await read_marker(router) for _ in range(4)]
+
+    assert asyncio.run(run()) == ["r1", "r2", "r1", "r2"]
+
+
+def test_unhealthy_replica_falls_back(tmp_path, make_router):
+    urls = [f"sqlite:///{tmp_path}/missing/dir/r1.db", make_replica(tmp_path / "r2.db", "r2")]
+    router = make_router(urls)
+
+    async def run():
+        return [await read_marker(router) for _ in range(3)]
+
+    assert asyncio.run(run()) == ["r2", "r2", "r2"]
+
+    # No healthy replica left: use the primary
+    dead = make_router(urls[:1])
+    assert asyncio.run(read_marker(dead)) == "primary"
+
+
+def test_recent_writer_reads_from_primary(tmp_path, make_router):
+    router = make_router([make_replica(tmp_path / "r1.db", "r1")])
+    router.record_write("42")
+
+    assert asyncio.run(read_marker(router, "42")) == "primary"
+    assert asyncio.run(read_marker(router, "7")) == "r1"
+
+
+def test_sticky_cookie_pins_reads_on_other_workers(tmp_path, make_router, monkeypatch):
+    urls = [make_replica(tmp_path / "r1.db", "r1")]
+    writer, reader = make_router(urls), make_router(urls)
+    cookie = writer.sticky_cookie("42")
+
+    # Another process never saw the write, the cookie carries it
+    assert asyncio.run(read_marker(reader, "42", cookie)) == "primary"
+    assert asyncio.run(read_marker(reader, "7", cookie)) == "r1"
+    until, _, signature = cookie.partition(".")
+    assert asyncio.run(read_marker(reader, "42", f"{int(until) + 60}.{signature}")) == "r1"
+
+    monkeypatch.setattr("app.database.time.time", lambda: int(until) + 1)
+    assert asyncio.run(read_marker(reader, "42", cookie)) == "r1"
+
+
+def test_pool_metrics(tmp_path):
+    from sqlalchemy import create_engine
+    from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+    from app.core.db_metrics import InstrumentedQueuePool, instrument_engine, pool_metrics
+
+    engine = create_engine(
+        f"sqlite:///{tmp_path}/pool.db",
+        poolclass=InstrumentedQueuePool, pool_size=1, max_overflow=0, pool_timeout=0.05
+    )
+    metrics = instrument_engine(engine, "test")
+
+    conn = engine.connect()
+    snapshot = metrics.snapshot()
+    assert snapshot["checked_out"] == 1
+    assert snapshot["idle"] == 0
+    assert snapshot["connects"] == 1
+
+    with pytest.raises(PoolTimeoutError):
+        engine.connect()
+    conn.close()
+
+    snapshot = metrics.snapshot()
+    assert snapshot["timeouts"] == 1
+    assert snapshot["checked_out"] == 0
+    assert snapshot["idle"] == 1
+    assert snapshot["wait_count"] == 2
+    assert snapshot["wait_max_ms"] >= 50
+    pool_metrics.pop("test")
+    engine.dispose()
+
+
+def test_db_health_endpoint(client):
+    response = client.get("/health/db")
+    assert response.status_code == 200
+    assert "primary" in response.json()
@@ -38,4 +38,32 @@ def test_invalid_token():
     """Test decode_access_token with invalid token"""
     payload = decode_access_token("invalid.token.here")
     assert payload is None
-    print(f"✅ Invalid Token Handled!")
\ No newline at end of file
+    print(f"✅ Invalid Token Handled!")
+
+def test_get_current_user_uses_principal_cache(client, query_counter):
+    from app.dependencies import principal_cache
+
+    client.post("/api/v1/auth/register", json={"email": "cache@test.com", "username": "cacheuser", "password": "password123"})
+    login = client.post("/api/v1/auth/login", data={"username": "cacheuser", "password": "password123"})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    assert client.get("/api/v1/users/me", headers=headers).status_code == 200
+    query_counter.clear()
+    response = client.get("/api/v1/users/me", headers=headers)
+
+    assert response.json()["username"] == "cacheuser"
+    assert not any("FROM users" in statement for statement in query_counter)
+    assert principal_cache.stats()["hits"] == 1
+
+
+def test_principal_cache_invalidated_on_update(client):
+    client.post("/api/v1/auth/register", json={"email": "cache@test.com", "username": "cacheuser", "password": "password123"})
+    login = client.post("/api/v1/auth/login", data={"username": "cacheuser", "password": "password123"})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    client.get("/api/v1/users/me", headers=headers)
+    client.put("/api/v1/users/me", json={"full_name": "Renamed"}, headers=headers)
+    assert client.get("/api/v1/users/me", headers=headers).json()["full_name"] == "Renamed"
+
+    client.delete("/api/v1/users/me", headers=headers)
+    assert client.get("/api/v1/users/me", headers=headers).status_code == 401
@@ -0,0 +1,81 @@
+import asyncio
+import pytest
+from app import models
+from app.models.like import pending_like_counts
+from app.services.likes import flush_like_counts
+from tests.conftest import TestingAsyncSessionLocal
+
+
+@pytest.fixture
+def authorized_client(client):
+    client.post("/api/v1/auth/register", json={"email": "liker@test.com", "username": "liker", "password": "password123"})
+    token = client.post(
+        "/api/v1/auth/login", data={"username": "liker@test.com", "password": "password123"}
+    ).json()["access_token"]
+    client.headers = {**client.headers, "Authorization": f"Bearer {token}"}
+    return client
+
+
+@pytest.fixture
+def post_id(authorized_client):
+    return authorized_client.post("/api/v1/posts", json={"title": "Likeable", "content": "Content"}).json()["id"]
+
+
+def flush():
+    async def run():
+        async with TestingAsyncSessionLocal() as db:
+            return await flush_like_counts(db)
+    return asyncio.run(run())
+
+
+def test_like_is_idempotent_and_counted_before_flush(authorized_client, post_id, session):
+    assert authorized_client.post(f"/api/v1/posts/{post_id}/like").status_code == 204
+    assert authorized_client.post(f"/api/v1/posts/{post_id}/like").status_code == 204
+
+    assert session.query(models.Like).count() == 1
+    assert authorized_client.get(f"/api/v1/posts/{post_id}").json()["like_count"] == 1
+    assert authorized_client.get("/api/v1/posts").json()[0]["like_count"] == 1
+    # Not written to the post row yet
+    assert session.get(models.Post, post_id).like_count == 0
+
+
+def test_flush_batches_pending_deltas(authorized_client, post_id, session):
+    authorized_client.post(f"/api/v1/posts/{post_id}/like")
+
+    assert flush() == 1
+    assert pending_like_counts.pending(post_id) == 0
+    session.expire_all()
+    assert session.get(models.Post, post_id).like_count == 1
+    assert authorized_client.get(f"/api/v1/posts/{post_id}").json()["like_count"] == 1
+
+    assert authorized_client.delete(f"/api/v1/posts/{post_id}/like").status_code == 204
+    assert authorized_client.delete(f"/api/v1/posts/{post_id}/like").status_code == 204
+    assert authorized_client.get(f"/api/v1/posts/{post_id}").json()["like_count"] == 0
+    flush()
+    session.expire_all()
+    assert session.get(models.Post, post_id).like_count == 0
+    assert flush() == 0
+
+
+def test_flush_leaves_updated_at_alone(authorized_client, post_id, session):
+    updated_at = session.get(models.Post, post_id).updated_at
+    authorized_client.post(f"/api/v1/posts/{post_id}/like")
+    flush()
+
+    session.expire_all()
+    post = session.get(models.Post, post_id)
+    assert post.like_count == 1
+    assert post.updated_at == updated_at
+
+
+def test_like_changes_etag(authorized_client, post_id):
+    etag = authorized_client.get(f"/api/v1/posts/{post_id}").headers["ETag"]
+    authorized_client.post(f"/api/v1/posts/{post_id}/like")
+
+    response = authorized_client.get(f"/api/v1/posts/{post_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["like_count"] == 1
+
+
+def test_like_missing_post(authorized_client):
+    assert authorized_client.post("/api/v1/posts/999/like").status_code == 404
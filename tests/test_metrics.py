@@ -0,0 +1,33 @@
+import re
+from app.core.metrics import registry
+
+
+def test_server_timing_reports_db_queries(client, query_counter):
+    client.post("/api/v1/auth/register", json={"email": "m@test.com", "username": "metrics", "password": "password123"})
+
+    query_counter.clear()
+    response = client.get("/api/v1/posts")
+    timing = response.headers["Server-Timing"]
+
+    match = re.match(r'db;dur=([\d.]+);desc="(\d+) queries", app;dur=([\d.]+)', timing)
+    assert match
+    assert int(match.group(2)) == len(query_counter) > 0
+
+
+def test_metrics_endpoint_labels_routes_by_template(client):
+    registry.reset()
+    client.get("/api/v1/posts/12345")
+    client.get("/api/v1/posts/67890")
+    client.get("/does-not-exist")
+
+    body = client.get("/metrics").text
+
+    assert 'http_requests_total{method="GET",route="/api/v1/posts/{post_id}",status="404"} 2' in body
+    assert 'http_requests_total{method="GET",route="unmatched",status="404"} 1' in body
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/v1/posts/{post_id}"} 2' in body
+    assert 'http_request_latency_seconds{method="GET",route="/api/v1/posts/{post_id}",quantile="0.99"}' in body
+    assert 'http_request_db_queries_total{method="GET",route="/api/v1/posts/{post_id}"}' in body
+    # The scrape itself is in flight while rendering
+    assert "http_requests_in_flight 1" in body
+    assert "principal_cache_hits_total" in body
+    assert 'db_pool_checkouts_total{engine="primary"}' in body
@@ -1,4 +1,9 @@
 import pytest
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from app.database import Base
+from app.models.search import include_object
+from tests.conftest import engine
 
 
 @pytest.fixture
@@ -127,4 +132,253 @@ def test_delete_post(authorized_client):
     )
     post_id = create.json()["id"]
     response = authorized_client.delete(f"/api/v1/posts/{post_id}")
-    assert response.status_code == 204
\ No newline at end of file
+    assert response.status_code == 204
+
+def test_get_posts_cursor_pagination(authorized_client):
+    for i in range(5):
+        authorized_client.post("/api/v1/posts", json={"title": f"Post {i}", "content": f"Content {i}"})
+
+    first = authorized_client.get("/api/v1/posts", params={"limit": 2})
+    assert first.status_code == 200
+    assert [p["title"] for p in first.json()] == ["Post 4", "Post 3"]
+    cursor = first.headers["X-Next-Cursor"]
+
+    # A new post must not shift the next page
+    authorized_client.post("/api/v1/posts", json={"title": "Post 5", "content": "Content 5"})
+
+    second = authorized_client.get("/api/v1/posts", params={"limit": 2, "cursor": cursor})
+    assert [p["title"] for p in second.json()] == ["Post 2", "Post 1"]
+
+    last = authorized_client.get("/api/v1/posts", params={"limit": 2, "cursor": second.headers["X-Next-Cursor"]})
+    assert [p["title"] for p in last.json()] == ["Post 0"]
+    assert "X-Next-Cursor" not in last.headers
+
+
+def test_get_user_posts_cursor_pagination(authorized_client, test_user):
+    for i in range(3):
+        authorized_client.post("/api/v1/posts", json={"title": f"Post {i}", "content": f"Content {i}"})
+
+    first = authorized_client.get(f"/api/v1/posts/user/{test_user['id']}", params={"limit": 2})
+    assert len(first.json()) == 2
+    second = authorized_client.get(
+        f"/api/v1/posts/user/{test_user['id']}",
+        params={"limit": 2, "cursor": first.headers["X-Next-Cursor"]}
+    )
+    assert [p["title"] for p in second.json()] == ["Post 0"]
+
+
+def test_get_posts_invalid_cursor(client):
+    response = client.get("/api/v1/posts", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+def _seed_posts_with_owners(session, count):
+    from app import models
+
+    for i in range(count):
+        user = models.User(email=f"owner{i}@test.com", username=f"owner{i}", hashed_password="x")
+        session.add(user)
+        session.flush()
+        session.add(models.Post(title=f"Post {i}", content="Content", owner_id=user.id))
+    session.commit()
+
+
+def test_get_posts_query_count_independent_of_page_size(client, session, query_counter):
+    _seed_posts_with_owners(session, 10)
+
+    query_counter.clear()
+    small = client.get("/api/v1/posts", params={"limit": 2})
+    small_queries = len(query_counter)
+
+    query_counter.clear()
+    large = client.get("/api/v1/posts", params={"limit": 10})
+    large_queries = len(query_counter)
+
+    assert len(small.json()) == 2
+    assert len(large.json()) == 10
+    assert all(p["owner"]["username"].startswith("owner") for p in large.json())
+    assert large_queries == small_queries
+
+
+def test_search_posts(authorized_client):
+    authorized_client.post("/api/v1/posts", json={"title": "Python tips", "content": "Use generators"})
+    authorized_client.post("/api/v1/posts", json={"title": "Cooking", "content": "Python recipes, python everywhere"})
+    authorized_client.post("/api/v1/posts", json={"title": "Unrelated", "content": "Nothing to see"})
+
+    response = authorized_client.get("/api/v1/posts/search", params={"q": "python"})
+    assert response.status_code == 200
+    assert sorted(p["title"] for p in response.json()) == ["Cooking", "Python tips"]
+    assert response.json()[0]["owner"]["username"] == "postuser"
+
+
+def test_search_posts_follows_updates_and_pages(authorized_client):
+    ids = [
+        authorized_client.post("/api/v1/posts", json={"title": f"Rust {i}", "content": "borrow checker"}).json()["id"]
+        for i in range(3)
+    ]
+    authorized_client.put(f"/api/v1/posts/{ids[0]}", json={"content": "lifetimes"})
+
+    first = authorized_client.get("/api/v1/posts/search", params={"q": "borrow", "limit": 1})
+    second = authorized_client.get(
+        "/api/v1/posts/search",
+        params={"q": "borrow", "limit": 1, "cursor": first.headers["X-Next-Cursor"]}
+    )
+    found = [p["id"] for p in first.json() + second.json()]
+    assert sorted(found) == sorted(ids[1:])
+    assert "X-Next-Cursor" not in second.headers
+
+
+def test_search_posts_ignores_query_syntax(client):
+    response = client.get("/api/v1/posts/search", params={"q": '"AND* (:'})
+    assert response.status_code == 200
+    assert response.json() == []
+
+
+def test_autogenerate_ignores_search_structures(session):
+    with engine.connect() as conn:
+        context = MigrationContext.configure(conn, opts={"include_object": include_object})
+        diff = compare_metadata(context, Base.metadata)
+    assert "fts" not in repr(diff) and "search" not in repr(diff)
+
+    with engine.connect() as conn:
+        unfiltered = compare_metadata(MigrationContext.configure(conn), Base.metadata)
+    assert "posts_fts" in repr(unfiltered)
+
+
+def test_create_posts_bulk(authorized_client, query_counter):
+    payload = {"posts": [{"title": f"Bulk {i}", "content": f"Content {i}"} for i in range(5)]}
+    response = authorized_client.post("/api/v1/posts/bulk", json=payload)
+
+    assert response.status_code == 201
+    assert [p["title"] for p in response.json()] == [f"Bulk {i}" for i in range(5)]
+    assert len([s for s in query_counter if s.startswith("INSERT INTO posts")]) == 1
+    assert len(authorized_client.get("/api/v1/timeline").json()) == 5
+
+
+def test_create_posts_bulk_validates_every_item(authorized_client):
+    payload = {"posts": [{"title": "Ok", "content": "Ok"}, {"title": "", "content": "Bad"}]}
+    response = authorized_client.post("/api/v1/posts/bulk", json=payload)
+    assert response.status_code == 422
+    assert authorized_client.get("/api/v1/posts").json() == []
+
+
+def test_create_posts_bulk_limits_size(authorized_client):
+    from app.core.config import settings
+
+    payload = {"posts": [{"title": "t", "content": "c"}] * (settings.BULK_POST_MAX_ITEMS + 1)}
+    assert authorized_client.post("/api/v1/posts/bulk", json=payload).status_code == 422
+
+
+def test_get_post_conditional(authorized_client, query_counter):
+    post_id = authorized_client.post("/api/v1/posts", json={"title": "Cached", "content": "Body"}).json()["id"]
+
+    first = authorized_client.get(f"/api/v1/posts/{post_id}")
+    etag = first.headers["ETag"]
+
+    query_counter.clear()
+    cached = authorized_client.get(f"/api/v1/posts/{post_id}", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["ETag"] == etag
+    assert not any("posts.content" in statement for statement in query_counter)
+
+    authorized_client.put(f"/api/v1/posts/{post_id}", json={"content": "Changed"})
+    changed = authorized_client.get(f"/api/v1/posts/{post_id}", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()["content"] == "Changed"
+    assert changed.headers["ETag"] != etag
+
+
+def test_get_posts_conditional(authorized_client):
+    authorized_client.post("/api/v1/posts", json={"title": "One", "content": "Body"})
+    etag = authorized_client.get("/api/v1/posts").headers["ETag"]
+
+    assert authorized_client.get("/api/v1/posts", headers={"If-None-Match": etag}).status_code == 304
+
+    authorized_client.post("/api/v1/posts", json={"title": "Two", "content": "Body"})
+    assert authorized_client.get("/api/v1/posts", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_export_user_posts_streams_ndjson_and_resumes(authorized_client, test_user, monkeypatch):
+    import json
+    from app.routers import posts as posts_router
+
+    # Small batches so the export spans several fetches from the cursor
+    monkeypatch.setattr(posts_router, "EXPORT_BATCH_SIZE", 2)
+    for i in range(5):
+        authorized_client.post("/api/v1/posts", json={"title": f"Post {i}", "content": "Content"})
+
+    response = authorized_client.get(f"/api/v1/posts/user/{test_user['id']}/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["title"] for line in lines] == [f"Post {i}" for i in range(5)]
+
+    response = authorized_client.get(f"/api/v1/posts/user/{test_user['id']}/export", params={"since": lines[1]["cursor"]})
+    assert [json.loads(line)["title"] for line in response.text.splitlines()] == ["Post 2", "Post 3", "Post 4"]
+
+    response = authorized_client.get(f"/api/v1/posts/user/{test_user['id']}/export", params={"since": lines[-1]["cursor"]})
+    assert response.text == ""
+
+
+def test_export_user_posts_errors(client):
+    assert client.get("/api/v1/posts/user/999/export").status_code == 404
+    client.post("/api/v1/auth/register", json={"email": "e@test.com", "username": "exporter", "password": "password123"})
+    assert client.get("/api/v1/posts/user/1/export", params={"since": "garbage"}).status_code == 400
+
+
+def test_get_posts_batch_keeps_order_and_reports_missing(authorized_client, query_counter):
+    ids = [authorized_client.post("/api/v1/posts", json={"title": f"Post {i}", "content": "Content"}).json()["id"] for i in range(3)]
+
+    query_counter.clear()
+    response = authorized_client.get("/api/v1/posts/batch", params={"ids": f"{ids[2]},999,{ids[0]},{ids[2]}"})
+    assert response.status_code == 200
+    body = response.json()
+    assert [post["id"] for post in body["items"]] == [ids[2], ids[0]]
+    assert body["items"][0]["owner"]["username"] == "postuser"
+    assert body["missing"] == [999]
+    assert len([s for s in query_counter if "FROM posts" in s]) == 1
+
+    response = authorized_client.post("/api/v1/posts/batch", json={"ids": [ids[1], 998]})
+    assert [post["id"] for post in response.json()["items"]] == [ids[1]]
+    assert response.json()["missing"] == [998]
+
+
+def test_get_posts_batch_invalid_ids(client):
+    assert client.get("/api/v1/posts/batch", params={"ids": "1,abc"}).status_code == 400
+    assert client.get("/api/v1/posts/batch", params={"ids": ","}).status_code == 400
+    assert client.get("/api/v1/posts/batch", params={"ids": ",".join(map(str, range(101)))}).status_code == 400
+    assert client.post("/api/v1/posts/batch", json={"ids": []}).status_code == 422
+
+
+def test_get_posts_sparse_fields_defer_content(authorized_client, test_user, query_counter):
+    long_content = "word " * 400
+    authorized_client.post("/api/v1/posts", json={"title": "Long", "content": long_content})
+
+    full = authorized_client.get("/api/v1/posts").json()[0]
+    assert "excerpt" not in full and full["content"] == long_content
+
+    query_counter.clear()
+    response = authorized_client.get("/api/v1/posts", params={"fields": "id,title,excerpt"})
+    assert response.status_code == 200
+    (post,) = response.json()
+    assert set(post) == {"id", "title", "excerpt"}
+    assert len(post["excerpt"]) == 200 and post["excerpt"].endswith("…")
+    assert long_content.startswith(post["excerpt"][:-1])
+    (select_posts,) = [s for s in query_counter if "FROM posts" in s]
+    assert "posts.content" not in select_posts and "JOIN users" not in select_posts
+
+    # Another representation, another ETag
+    assert response.headers["ETag"] != authorized_client.get("/api/v1/posts").headers["ETag"]
+    etag = response.headers["ETag"]
+    again = authorized_client.get("/api/v1/posts", params={"fields": "id,title,excerpt"}, headers={"If-None-Match": etag})
+    assert again.status_code == 304
+
+    owner = authorized_client.get(f"/api/v1/posts/user/{test_user['id']}", params={"fields": "title,like_count"}).json()
+    assert owner == [{"title": "Long", "like_count": 0}]
+
+
+def test_sparse_fields_validation(authorized_client, test_user):
+    assert authorized_client.get("/api/v1/posts", params={"fields": "id,password"}).status_code == 400
+    assert authorized_client.get("/api/v1/posts", params={"fields": ","}).status_code == 400
+    # User post lists don't embed the owner
+    assert authorized_client.get(f"/api/v1/posts/user/{test_user['id']}", params={"fields": "owner"}).status_code == 400
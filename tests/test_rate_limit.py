@@ -0,0 +1,108 @@
+import pytest
+from pydantic import ValidationError
+from app.core.config import Settings
+from app.core.rate_limit import TokenBucketLimiter
+from app.dependencies import rate_limit
+
+
+def test_token_bucket_allows_burst_then_limits():
+    limiter = TokenBucketLimiter(rate=1, burst=2)
+    assert limiter.acquire("k") == 0
+    assert limiter.acquire("k") == 0
+    retry_after = limiter.acquire("k")
+    assert 0 < retry_after <= 1
+    # Other keys have their own bucket
+    assert limiter.acquire("other") == 0
+
+
+def test_token_bucket_evicts_least_recently_used():
+    limiter = TokenBucketLimiter(rate=1, burst=1, max_keys=2)
+    for key in ("a", "b", "c"):
+        limiter.acquire(key)
+    assert len(limiter) == 2
+
+
+def test_login_rate_limited_per_account(client, monkeypatch):
+    monkeypatch.setattr(rate_limit.auth_account_limiter, "burst", 2)
+
+    async def fail_verify(*args):
+        raise AssertionError("password must not be verified when rate limited")
+
+    for _ in range(2):
+        client.post("/api/v1/auth/login", data={"username": "victim", "password": "guess"})
+
+    monkeypatch.setattr("app.routers.auth.verify_and_update_password_async", fail_verify)
+    response = client.post("/api/v1/auth/login", data={"username": "victim", "password": "guess"})
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+
+
+def test_register_rate_limited_per_forwarded_ip(client, monkeypatch):
+    monkeypatch.setattr(rate_limit.auth_ip_limiter, "burst", 1)
+
+    def register(name, ip):
+        return client.post(
+            "/api/v1/auth/register",
+            json={"email": f"{name}@test.com", "username": name, "password": "password123"},
+            headers={"X-Forwarded-For": ip},
+        )
+
+    assert register("first", "203.0.113.1").status_code == 201
+    assert register("second", "203.0.113.1").status_code == 429
+    # Another client behind the same proxy has its own bucket
+    assert register("third", "203.0.113.2").status_code == 201
+
+
+def test_create_post_rate_limited_per_user(client, monkeypatch):
+    monkeypatch.setattr(rate_limit.post_write_limiter, "burst", 1)
+    client.post("/api/v1/auth/register", json={"email": "w@test.com", "username": "writer", "password": "password123"})
+    token = client.post("/api/v1/auth/login", data={"username": "writer", "password": "password123"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    assert client.post("/api/v1/posts", json={"title": "1", "content": "1"}, headers=headers).status_code == 201
+    response = client.post("/api/v1/posts", json={"title": "2", "content": "2"}, headers=headers)
+    assert response.status_code == 429
+    assert "Retry-After" in response.headers
+
+
+def test_bulk_posts_charged_per_post(client, monkeypatch):
+    monkeypatch.setattr(rate_limit.post_write_limiter, "burst", 5)
+    client.post("/api/v1/auth/register", json={"email": "b@test.com", "username": "bulker", "password": "password123"})
+    token = client.post("/api/v1/auth/login", data={"username": "bulker", "password": "password123"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    def bulk(count):
+        posts = [{"title": f"Post {i}", "content": "Content"} for i in range(count)]
+        return client.post("/api/v1/posts/bulk", json={"posts": posts}, headers=headers)
+
+    assert bulk(3).status_code == 201
+    # 2 tokens left
+    response = bulk(3)
+    assert response.status_code == 429
+    assert "Retry-After" in response.headers
+    assert bulk(2).status_code == 201
+    assert client.post("/api/v1/posts", json={"title": "1", "content": "1"}, headers=headers).status_code == 429
+
+
+def test_token_bucket_cost_above_burst_goes_into_debt():
+    limiter = TokenBucketLimiter(rate=1, burst=2)
+    assert limiter.acquire("k", cost=5) == 0
+    # 3 tokens owed, plus the one asked for
+    assert limiter.acquire("k") > 3
+
+
+@pytest.mark.parametrize("name, value", [
+    ("AUTH_IP_RATE_PER_MINUTE", 0),
+    ("POST_WRITE_RATE_PER_MINUTE", -1),
+    ("AUTH_ACCOUNT_BURST", 0),
+])
+def test_settings_reject_unusable_buckets(name, value):
+    # A rate of 0 would make Retry-After infinite
+    with pytest.raises(ValidationError):
+        Settings(**{name: value})
+
+
+def test_login_shed_when_hash_pool_saturated(client, monkeypatch):
+    monkeypatch.setattr(rate_limit, "password_hash_pool_saturated", lambda: True)
+    response = client.post("/api/v1/auth/login", data={"username": "someone", "password": "password123"})
+    assert response.status_code == 503
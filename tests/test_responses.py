@@ -0,0 +1,40 @@
+import asyncio
+import json
+from typing import List
+from fastapi import Response
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from app import models, schemas
+from app.core.responses import model_response, render_model
+from app.database import utcnow
+
+
+def make_posts():
+    now = utcnow()
+    owner = models.User(id=1, email="a@test.com", username="alice", full_name=None, hashed_password="x",
+                        is_active=True, follower_count=0, created_at=now, updated_at=now)
+    return [
+        models.Post(id=i, title=f"Post {i}", content="Content", owner_id=1, owner=owner,
+                    like_count=i, created_at=now, updated_at=now)
+        for i in range(3)
+    ]
+
+
+def test_render_model_matches_response_model_serialization():
+    posts = make_posts()
+    for schema, content in [(List[schemas.PostDetailOut], posts), (schemas.PostOut, posts[0])]:
+        field = create_response_field(name="test", type_=schema)
+        expected = asyncio.run(serialize_response(field=field, response_content=content))
+        assert json.loads(render_model(schema, content)) == expected
+
+
+def test_model_response_keeps_route_headers():
+    injected = Response()
+    injected.headers["X-Next-Cursor"] = "abc"
+
+    response = model_response(List[schemas.PostOut], make_posts(), injected)
+
+    assert response.headers["X-Next-Cursor"] == "abc"
+    assert response.headers["content-type"] == "application/json"
+    assert response.headers.getlist("content-length") == [str(len(response.body))]
+    assert [post["id"] for post in json.loads(response.body)] == [0, 1, 2]
@@ -0,0 +1,107 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from app.core.config import settings
+from app.core.slow_query import MASK, MAX_PENDING_EXPLAINS, mask_parameters, slow_query_log
+
+
+@pytest.fixture
+def log_everything(monkeypatch):
+    slow_query_log.clear()
+    monkeypatch.setattr(slow_query_log, "threshold_ms", 1e-6)
+    monkeypatch.setattr(slow_query_log, "explain_sample_rate", 1.0)
+    yield slow_query_log
+    slow_query_log.clear()
+
+
+@pytest.fixture
+def admin_client(client, monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_USERNAMES", ["admin"])
+    client.post("/api/v1/auth/register", json={"email": "admin@test.com", "username": "admin", "password": "password123"})
+    token = client.post(
+        "/api/v1/auth/login", data={"username": "admin@test.com", "password": "password123"}
+    ).json()["access_token"]
+    client.headers = {**client.headers, "Authorization": f"Bearer {token}"}
+    return client
+
+
+def test_slow_queries_record_statement_parameters_and_route(client, log_everything):
+    client.get("/api/v1/posts/424242")
+
+    entry = log_everything.entries()[0]
+    assert entry["route"] == "GET /api/v1/posts/{post_id}"
+    assert "FROM posts" in entry["statement"]
+    assert "424242" in entry["parameters"]
+    # EXPLAIN ANALYZE is Postgres only
+    assert entry["plan"] is None
+
+
+def test_threshold_filters_fast_queries(client, log_everything, monkeypatch):
+    monkeypatch.setattr(slow_query_log, "threshold_ms", 60_000)
+    client.get("/api/v1/posts")
+    assert log_everything.entries() == []
+
+
+def test_slow_queries_endpoint_requires_admin(client, admin_client, log_everything, monkeypatch):
+    response = admin_client.get("/api/v1/admin/slow-queries")
+    assert response.status_code == 200
+    # The admin's own principal lookup is the newest entry
+    assert response.json()[0]["route"] == "GET /api/v1/admin/slow-queries"
+
+    assert admin_client.delete("/api/v1/admin/slow-queries").status_code == 204
+    assert slow_query_log.entries() == []
+
+    monkeypatch.setattr(settings, "ADMIN_USERNAMES", [])
+    assert admin_client.get("/api/v1/admin/slow-queries").status_code == 403
+
+
+def test_sensitive_parameters_are_masked(client, log_everything):
+    client.post("/api/v1/auth/register", json={"email": "secret@test.com", "username": "secret", "password": "password123"})
+    client.post("/api/v1/auth/login", data={"username": "secret@test.com", "password": "password123"})
+
+    entries = log_everything.entries()
+    insert = next(entry for entry in entries if entry["statement"].startswith("INSERT INTO users"))
+    assert "secret" in insert["parameters"]
+    assert MASK in insert["parameters"]
+    for entry in entries:
+        assert "secret@test.com" not in entry["parameters"]
+        assert "$2b$" not in entry["parameters"]
+
+
+def test_mask_parameters_by_bind_name():
+    assert mask_parameters({"email_1": "a@b.c", "id_1": 1}, None) == {"email_1": MASK, "id_1": 1}
+    assert mask_parameters(("a@b.c", "x", 1), ["email", "hashed_password", "id"]) == (MASK, MASK, 1)
+    assert mask_parameters([("a@b.c",), ("d@e.f",)], ["email"], executemany=True) == [(MASK,), (MASK,)]
+    # Email addresses whatever they are bound to, and without bind names
+    assert mask_parameters(("a@b.c", "ann"), ["username_1", "username_2"]) == (MASK, "ann")
+    assert mask_parameters(["a@b.c", 2], None) == (MASK, 2)
+
+
+def test_explain_runs_in_the_background(log_everything, monkeypatch):
+    async def fake_explain(url, statement, parameters, entry):
+        await asyncio.sleep(0)
+        entry["plan"] = f"plan for {statement}"
+        log_everything._pending_explains -= 1
+
+    monkeypatch.setattr(log_everything, "explain", fake_explain)
+    monkeypatch.setattr(log_everything, "should_explain", lambda conn, statement, executemany: True)
+    conn = SimpleNamespace(engine=SimpleNamespace(url="postgresql+asyncpg://db"))
+
+    async def slow_queries():
+        for _ in range(MAX_PENDING_EXPLAINS + 1):
+            log_everything.record(conn, "SELECT 1", (), False, 5.0)
+        # Recorded without waiting for the plan
+        assert [entry["plan"] for entry in log_everything.entries()] == [None] * (MAX_PENDING_EXPLAINS + 1)
+        await asyncio.gather(*log_everything._explain_tasks)
+
+    asyncio.run(slow_queries())
+    plans = [entry["plan"] for entry in log_everything.entries()]
+    # Past MAX_PENDING_EXPLAINS in flight the EXPLAIN is skipped, not queued
+    assert plans.count("plan for SELECT 1") == MAX_PENDING_EXPLAINS
+    assert plans.count(None) == 1
+    assert log_everything._pending_explains == 0
+
+    # No event loop (scripts, the sync engine): nothing to run it on
+    log_everything.record(conn, "SELECT 1", (), False, 5.0)
+    assert log_everything.entries()[0]["plan"] is None
@@ -0,0 +1,58 @@
+import asyncio
+import os
+import subprocess
+import sys
+import pytest
+from sqlalchemy import inspect, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.core.migrations import SchemaOutOfDateError, alembic_heads, check_schema
+from tests.conftest import async_engine, engine
+
+# Cold import of the app in a fresh interpreter; generous, it guards against
+# regressions like connecting to the database at import time
+IMPORT_BUDGET_SECONDS = 3.0
+
+
+def test_import_is_fast_and_does_not_touch_the_database():
+    code = (
+        "import time; start = time.perf_counter(); import app.main; "
+        "print(time.perf_counter() - start)"
+    )
+    # A database that can't be opened: importing must not need it
+    env = {**os.environ, "DATABASE_URL": "sqlite:////nonexistent/dir/app.db", "SECRET_KEY": "test"}
+    result = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, timeout=60)
+
+    assert result.returncode == 0, result.stderr
+    assert float(result.stdout.strip().splitlines()[-1]) < IMPORT_BUDGET_SECONDS
+
+
+def test_alembic_check_requires_head(session):
+    with pytest.raises(SchemaOutOfDateError):
+        asyncio.run(check_schema(async_engine, "alembic"))
+
+    (head,) = alembic_heads()
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE alembic_version (version_num VARCHAR(32) NOT NULL PRIMARY KEY)"))
+        conn.execute(text("INSERT INTO alembic_version VALUES (:head)"), {"head": head})
+    try:
+        asyncio.run(check_schema(async_engine, "alembic"))
+    finally:
+        with engine.begin() as conn:
+            conn.execute(text("DROP TABLE alembic_version"))
+
+
+def test_skip_and_create_modes(tmp_path):
+    unreachable = create_async_engine("sqlite+aiosqlite:////nonexistent/dir/app.db")
+    asyncio.run(check_schema(unreachable, "skip"))
+
+    fresh = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/fresh.db")
+
+    async def create_and_inspect():
+        await check_schema(fresh, "create")
+        async with fresh.connect() as conn:
+            return await conn.run_sync(lambda sync_conn: inspect(sync_conn).get_table_names())
+
+    assert {"users", "posts", "likes"} <= set(asyncio.run(create_and_inspect()))
+
+    with pytest.raises(ValueError):
+        asyncio.run(check_schema(fresh, "bogus"))
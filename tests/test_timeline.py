@@ -0,0 +1,130 @@
+import asyncio
+import pytest
+from app import models
+from app.core.config import settings
+from app.services.timeline import backfill_demoted_authors, demoted_authors
+from tests.conftest import TestingAsyncSessionLocal
+
+
+def make_user(client, name):
+    user = client.post(
+        "/api/v1/auth/register",
+        json={"email": f"{name}@test.com", "username": name, "password": "password123"}
+    ).json()
+    login = client.post("/api/v1/auth/login", data={"username": name, "password": "password123"})
+    user["headers"] = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    return user
+
+
+@pytest.fixture
+def alice(client):
+    return make_user(client, "alice")
+
+
+@pytest.fixture
+def bob(client):
+    return make_user(client, "bob")
+
+
+def backfill():
+    async def run():
+        async with TestingAsyncSessionLocal() as db:
+            return await backfill_demoted_authors(db)
+    return asyncio.run(run())
+
+
+def titles(response):
+    return [p["title"] for p in response.json()]
+
+
+def test_follow_fans_out_new_posts(client, alice, bob):
+    assert client.post(f"/api/v1/users/{bob['id']}/follow", headers=alice["headers"]).status_code == 204
+    client.post("/api/v1/posts", json={"title": "Bob 1", "content": "Hi"}, headers=bob["headers"])
+    client.post("/api/v1/posts", json={"title": "Alice 1", "content": "Hi"}, headers=alice["headers"])
+
+    response = client.get("/api/v1/timeline", headers=alice["headers"])
+    assert response.status_code == 200
+    assert titles(response) == ["Alice 1", "Bob 1"]
+    assert titles(client.get("/api/v1/timeline", headers=bob["headers"])) == ["Bob 1"]
+
+
+def test_follow_backfills_and_unfollow_removes(client, alice, bob):
+    client.post("/api/v1/posts", json={"title": "Old", "content": "Hi"}, headers=bob["headers"])
+
+    client.post(f"/api/v1/users/{bob['id']}/follow", headers=alice["headers"])
+    assert titles(client.get("/api/v1/timeline", headers=alice["headers"])) == ["Old"]
+
+    client.delete(f"/api/v1/users/{bob['id']}/follow", headers=alice["headers"])
+    assert titles(client.get("/api/v1/timeline", headers=alice["headers"])) == []
+
+
+def test_follow_twice_counted_once(client, alice, bob, session):
+    for _ in range(2):
+        assert client.post(f"/api/v1/users/{bob['id']}/follow", headers=alice["headers"]).status_code == 204
+
+    assert session.query(models.Follow).count() == 1
+    assert session.get(models.User, bob["id"]).follower_count == 1
+
+
+def test_follow_self_rejected(client, alice):
+    response = client.post(f"/api/v1/users/{alice['id']}/follow", headers=alice["headers"])
+    assert response.status_code == 400
+
+
+def test_celebrity_posts_merged_on_read(client, alice, bob, monkeypatch):
+    monkeypatch.setattr(settings, "FANOUT_FOLLOWER_THRESHOLD", 1)
+    client.post(f"/api/v1/users/{bob['id']}/follow", headers=alice["headers"])
+    for i in range(3):
+        client.post("/api/v1/posts", json={"title": f"Bob {i}", "content": "Hi"}, headers=bob["headers"])
+
+    first = client.get("/api/v1/timeline", params={"limit": 2}, headers=alice["headers"])
+    assert titles(first) == ["Bob 2", "Bob 1"]
+    second = client.get(
+        "/api/v1/timeline",
+        params={"limit": 2, "cursor": first.headers["X-Next-Cursor"]},
+        headers=alice["headers"]
+    )
+    assert titles(second) == ["Bob 0"]
+
+
+def test_posts_from_celebrity_days_kept_after_dropping_below_threshold(client, alice, bob, monkeypatch):
+    monkeypatch.setattr(settings, "FANOUT_FOLLOWER_THRESHOLD", 2)
+    carol = make_user(client, "carol")
+    client.post(f"/api/v1/users/{bob['id']}/follow", headers=alice["headers"])
+    client.post(f"/api/v1/users/{bob['id']}/follow", headers=carol["headers"])
+    client.post("/api/v1/posts", json={"title": "Famous", "content": "Hi"}, headers=bob["headers"])
+    assert titles(client.get("/api/v1/timeline", headers=alice["headers"])) == ["Famous"]
+
+    # Bob drops to one follower, so the post is no longer merged in on read; the
+    # unfollow only queues him for the background backfill
+    client.delete(f"/api/v1/users/{bob['id']}/follow", headers=carol["headers"])
+    assert demoted_authors == {bob["id"]}
+    assert backfill() == 1
+    assert demoted_authors == set()
+    assert titles(client.get("/api/v1/timeline", headers=alice["headers"])) == ["Famous"]
+    assert titles(client.get("/api/v1/timeline", headers=carol["headers"])) == []
+    assert titles(client.get("/api/v1/timeline", headers=bob["headers"])) == ["Famous"]
+
+
+def test_backfill_skips_authors_back_at_threshold(client, alice, bob, monkeypatch):
+    monkeypatch.setattr(settings, "FANOUT_FOLLOWER_THRESHOLD", 1)
+    client.post(f"/api/v1/users/{bob['id']}/follow", headers=alice["headers"])
+    client.delete(f"/api/v1/users/{bob['id']}/follow", headers=alice["headers"])
+    client.post(f"/api/v1/users/{bob['id']}/follow", headers=alice["headers"])
+
+    assert demoted_authors == {bob["id"]}
+    assert backfill() == 0
+
+
+def test_follow_and_unfollow_leave_updated_at_alone(client, alice, bob, session):
+    updated_at = session.get(models.User, bob["id"]).updated_at
+
+    client.post(f"/api/v1/users/{bob['id']}/follow", headers=alice["headers"])
+    session.expire_all()
+    assert session.get(models.User, bob["id"]).follower_count == 1
+    client.delete(f"/api/v1/users/{bob['id']}/follow", headers=alice["headers"])
+
+    session.expire_all()
+    bob_row = session.get(models.User, bob["id"])
+    assert bob_row.follower_count == 0
+    assert bob_row.updated_at == updated_at
@@ -0,0 +1,68 @@
+import asyncio
+from datetime import timedelta
+from app import models
+from app.database import utcnow
+from app.services.trending import trending
+from tests.conftest import TestingAsyncSessionLocal
+
+
+def refresh(full=False):
+    async def run():
+        async with TestingAsyncSessionLocal() as db:
+            if full:
+                await trending.rebuild(db, utcnow())
+            else:
+                await trending.update(db, utcnow())
+    asyncio.run(run())
+
+
+def seed(session, ages_hours):
+    now = utcnow()
+    users = [models.User(email=f"user{i}@test.com", username=f"user{i}", hashed_password="x") for i in range(5)]
+    session.add_all(users)
+    session.flush()
+    posts = [
+        models.Post(title=f"Post {i}", content="Content", owner_id=users[0].id, created_at=now - timedelta(hours=age))
+        for i, age in enumerate(ages_hours)
+    ]
+    session.add_all(posts)
+    session.commit()
+    return users, posts
+
+
+def like(session, users, post, count):
+    session.add_all(models.Like(user_id=user.id, post_id=post.id) for user in users[:count])
+    session.commit()
+
+
+def test_rebuild_ranks_by_likes_and_age(client, session):
+    users, (fresh, liked, old, expired) = seed(session, [0, 1, 20, 72])
+    like(session, users, liked, 4)
+    like(session, users, old, 5)
+    like(session, users, expired, 5)
+
+    refresh(full=True)
+
+    # The 72h old post is outside the 48h window despite its likes
+    assert [post_id for post_id, _ in trending.top(10)] == [liked.id, fresh.id, old.id]
+    response = client.get("/api/v1/posts/trending", params={"limit": 2})
+    assert [post["title"] for post in response.json()] == ["Post 1", "Post 0"]
+
+
+def test_update_folds_in_new_posts_and_likes(client, session):
+    users, (first, second) = seed(session, [1, 1])
+    refresh(full=True)
+    like(session, users, second, 3)
+    newest = models.Post(title="Newest", content="Content", owner_id=users[0].id)
+    session.add(newest)
+    session.commit()
+
+    refresh()
+
+    ranked = [post_id for post_id, _ in trending.top(10)]
+    assert ranked[0] == second.id
+    assert set(ranked) == {first.id, second.id, newest.id}
+
+
+def test_trending_empty_before_first_refresh(client):
+    assert client.get("/api/v1/posts/trending").json() == []
@@ -0,0 +1,73 @@
+import pytest
+
+
+@pytest.fixture
+def test_user(client):
+    response = client.post(
+        "/api/v1/auth/register",
+        json={"email": "me@test.com", "username": "meuser", "password": "password123"}
+    )
+    return response.json()
+
+
+@pytest.fixture
+def authorized_client(client, test_user):
+    login = client.post("/api/v1/auth/login", data={"username": "me@test.com", "password": "password123"})
+    client.headers = {**client.headers, "Authorization": f"Bearer {login.json()['access_token']}"}
+    return client
+
+
+def test_get_me(authorized_client, test_user):
+    response = authorized_client.get("/api/v1/users/me")
+    assert response.status_code == 200
+    assert response.json()["id"] == test_user["id"]
+
+
+def test_get_user_by_id(client, test_user):
+    response = client.get(f"/api/v1/users/{test_user['id']}")
+    assert response.status_code == 200
+    assert response.json()["username"] == "meuser"
+
+
+def test_get_user_not_found(client):
+    response = client.get("/api/v1/users/99999")
+    assert response.status_code == 404
+
+
+def test_update_me(authorized_client):
+    response = authorized_client.put("/api/v1/users/me", json={"full_name": "New Name"})
+    assert response.status_code == 200
+    assert response.json()["full_name"] == "New Name"
+
+
+def test_delete_me(authorized_client):
+    authorized_client.post("/api/v1/posts", json={"title": "Post", "content": "Content"})
+    response = authorized_client.delete("/api/v1/users/me")
+    assert response.status_code == 204
+    assert authorized_client.get("/api/v1/users/me").status_code == 401
+
+
+def test_get_user_conditional(authorized_client, test_user):
+    url = f"/api/v1/users/{test_user['id']}"
+    etag = authorized_client.get(url).headers["ETag"]
+    assert authorized_client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    authorized_client.put("/api/v1/users/me", json={"full_name": "Changed"})
+    assert authorized_client.get(url, headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_get_users_batch(authorized_client, test_user):
+    other = authorized_client.post(
+        "/api/v1/auth/register", json={"email": "other@test.com", "username": "otheruser", "password": "password123"}
+    ).json()
+
+    response = authorized_client.get("/api/v1/users/batch", params={"ids": f"{other['id']},12345,{test_user['id']}"})
+    assert response.status_code == 200
+    assert [user["username"] for user in response.json()["items"]] == ["otheruser", "meuser"]
+    assert response.json()["missing"] == [12345]
+
+    # Deleted accounts are reported missing even before they are purged
+    authorized_client.delete("/api/v1/users/me")
+    response = authorized_client.post("/api/v1/users/batch", json={"ids": [test_user["id"], other["id"]]})
+    assert [user["id"] for user in response.json()["items"]] == [other["id"]]
+    assert response.json()["missing"] == [test_user["id"]]